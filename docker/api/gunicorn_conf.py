@@ -1,5 +1,6 @@
 import multiprocessing
 import os
+import shutil
 
 workers_per_core_str = os.getenv("WORKERS_PER_CORE", "1")
 max_workers_str = os.getenv("MAX_WORKERS")
@@ -45,3 +46,19 @@ accesslog = use_accesslog
 graceful_timeout = int(graceful_timeout_str)
 timeout = int(timeout_str)
 keepalive = int(keepalive_str)
+
+# Workers aggregate their metrics through the memory-mapped files of prometheus_client in shared memory. Set before
+# any worker imports prometheus_client, which picks its multiprocess mode on import.
+metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/metrics")
+
+
+def on_starting(server):
+    # Drop the metrics of a previous run
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from app.core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -2,9 +2,11 @@ import uuid
 
 from fastapi import APIRouter, HTTPException
 from fastapi_async_sqlalchemy import db
+from sqlalchemy.orm import selectinload
 
 from app import models, schemas
 from app.core import CrudEndpointCreator, FastAPIStructLogger, enqueue_job
+from app.core.streaming import StreamFormat
 from app.crud import crud_hero
 
 log = FastAPIStructLogger()
@@ -12,14 +14,16 @@ router = APIRouter(prefix="/hero", tags=["heroes"])
 
 
 # Demonstrate working with relationships
-@router.get("/{hero_id}/ability", response_model=schemas.HeroSchema)
+@router.get("/{hero_id}/ability", response_model=schemas.AbilitySchema)
 async def get_hero_ability(hero_id: uuid.UUID):
     log.bind(requested_hero_id=hero_id)
-    hero = await crud_hero.get(db.session, hero_id)
+    hero = await crud_hero.get(db.session, hero_id, options=[selectinload(models.Hero.ability)])
     if not hero:
         log.warning("Hero not found")
         raise HTTPException(status_code=404, detail="Hero not found")
-    await db.session.refresh(hero, attribute_names=["ability"])
+    if not hero.ability:
+        log.warning("Hero has no ability")
+        raise HTTPException(status_code=404, detail="Hero has no ability")
     log.info("Returning hero ability")
     await enqueue_job("print_hero", hero.id)
     await enqueue_job("print_hero", hero.id)
@@ -33,5 +37,7 @@ crud_generator = CrudEndpointCreator(
     create_schema=schemas.HeroCreateSchema,
     update_schema=schemas.HeroUpdateSchema,
     filter_schema=schemas.HeroFilter,
+    cursor_pagination=True,
+    stream_format=StreamFormat.JSON,
 )
 crud_generator.add_routes_to_router(router)
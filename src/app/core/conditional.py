@@ -0,0 +1,83 @@
+"""
+Conditional GET support: validators derived from `updated_at` and evaluation of request preconditions.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def _version(id: Any, updated_at: datetime | None) -> str:
+    return f"{id}:{updated_at.isoformat() if updated_at else ''}"
+
+
+class Validators:
+    """
+    ETag and Last-Modified of a response, derived from the id and `updated_at` of the rows it contains.
+
+    ETags are weak, as they identify the row versions rather than the exact bytes of the representation.
+    """
+
+    def __init__(self, versions: Iterable[str], last_modified: datetime | None = None):
+        digest = hashlib.blake2b("\n".join(versions).encode(), digest_size=16).hexdigest()
+        self.etag = f'W/"{digest}"'
+        self.last_modified = last_modified
+
+    @classmethod
+    def for_entity(cls, id: Any, updated_at: datetime | None, *extra: Any) -> "Validators":
+        return cls([_version(id, updated_at), *(str(value) for value in extra)], updated_at)
+
+    @classmethod
+    def for_collection(cls, items: Iterable[Any], *extra: Any) -> "Validators":
+        """
+        Validators of a list of rows. `extra` holds further parts of the response, such as totals or cursors, that
+        have to change the ETag as well.
+
+        Lists carry no Last-Modified, as rows that dropped out of the list would not advance it.
+        """
+        versions = [_version(item.id, item.updated_at) for item in items] + [str(value) for value in extra]
+        return cls(versions)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(UTC), usegmt=True)
+        return headers
+
+    def is_not_modified(self, request: Request) -> bool:
+        """
+        Evaluates If-None-Match and If-Modified-Since as per RFC 9110. If-Modified-Since is only considered if the
+        request does not carry If-None-Match.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            # Weak comparison: the W/ prefix is ignored on both sides
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        # HTTP dates have a resolution of one second
+        return self.last_modified.replace(microsecond=0) <= since
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(validators: Validators) -> Response:
+    return Response(status_code=304, headers=validators.headers)
@@ -31,6 +31,27 @@ class AppSettings(BaseSettings):
     LOG_LEVEL: str = config("LOG_LEVEL", default="INFO")
     LOG_JSON_FORMAT: bool = config("LOG_JSON_FORMAT", default=False)
     LOG_INCLUDE_STACK: bool = config("LOG_INCLUDE_STACK", default=True)
+    # Log entries are rendered and written by a background thread with a queue of this size, 0 (the default) writes
+    # synchronously. A full queue drops entries, see LOG_QUEUE_OVERFLOW
+    LOG_QUEUE_SIZE: int = config("LOG_QUEUE_SIZE", default=0)
+    # What happens to entries logged while the queue is full: drop_debug_first or block
+    LOG_QUEUE_OVERFLOW: str = config("LOG_QUEUE_OVERFLOW", default="drop_debug_first")
+    # Seconds an entry waits for room in a full queue before it is dropped
+    LOG_QUEUE_TIMEOUT: float = config("LOG_QUEUE_TIMEOUT", default=0.1)
+    # Access log sampling as comma separated rates by status class and by route (path template) of successful
+    # requests, e.g. "2xx=0.01,3xx=0.01" and "/api/v1/hero/{id}=0.1". Requests slower than the threshold (seconds,
+    # 0 disables) are always logged. Jobs are sampled at the job rate, keyed on the correlation id of the request that
+    # enqueued them (or a new one outside of requests): if the job rate is at least the rate of the request, the jobs
+    # of a sampled request are logged as well.
+    LOG_ACCESS_SAMPLE_RATES: str = config("LOG_ACCESS_SAMPLE_RATES", default="")
+    LOG_ACCESS_ROUTE_SAMPLE_RATES: str = config("LOG_ACCESS_ROUTE_SAMPLE_RATES", default="")
+    LOG_ACCESS_SLOW_THRESHOLD: float = config("LOG_ACCESS_SLOW_THRESHOLD", default=0.0)
+    LOG_JOB_SAMPLE_RATE: float = config("LOG_JOB_SAMPLE_RATE", default=1.0)
+    # Response compression: bodies below the minimum size (in bytes) are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = config("COMPRESSION_MINIMUM_SIZE", default=1024)
+    COMPRESSION_GZIP_LEVEL: int = config("COMPRESSION_GZIP_LEVEL", default=6)
+    COMPRESSION_BROTLI_QUALITY: int = config("COMPRESSION_BROTLI_QUALITY", default=4)
+    COMPRESSION_ZSTD_LEVEL: int = config("COMPRESSION_ZSTD_LEVEL", default=3)
 
 
 class PostgresSettings(BaseSettings):
@@ -45,6 +66,10 @@ class PostgresSettings(BaseSettings):
     POSTGRES_DB: str = config("POSTGRES_DB", default="postgres")
     POSTGRES_ASYNC_PREFIX: str = config("POSTGRES_ASYNC_PREFIX", default="postgresql+asyncpg://")
     POSTGRES_URI: str = f"{POSTGRES_ASYNC_PREFIX}{POSTGRES_USER}:{quote(POSTGRES_PASSWORD)}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    # Comma separated URIs of read replicas, including the async prefix
+    POSTGRES_REPLICA_URIS: str = config("POSTGRES_REPLICA_URIS", default="")
+    # How reads are balanced between replicas: round_robin or least_connections
+    POSTGRES_REPLICA_STRATEGY: str = config("POSTGRES_REPLICA_STRATEGY", default="round_robin")
 
 
 class RedisQueueSettings(BaseSettings):
@@ -56,6 +81,55 @@ class RedisQueueSettings(BaseSettings):
     REDIS_QUEUE_PORT: int = config("REDIS_QUEUE_PORT", default=6379)
 
 
+class EntityCacheSettings(BaseSettings):
+    """
+    Settings for the cache of single entities served by the CRUD read endpoints
+    """
+
+    # Entries of the in-process tier, 0 disables it. Each process only sees its own writes, so with several processes
+    # the in-process tier serves entries up to the TTL stale: prefer the Redis tier on its own there
+    ENTITY_CACHE_MAX_SIZE: int = config("ENTITY_CACHE_MAX_SIZE", default=0)
+    ENTITY_CACHE_TTL: float = config("ENTITY_CACHE_TTL", default=30.0)
+    ENTITY_CACHE_REDIS: bool = config("ENTITY_CACHE_REDIS", default=False)
+
+
+class CrudSettings(BaseSettings):
+    """
+    Settings for the CRUD objects
+    """
+
+    # Raise on lazy loads of relationships not covered by the loader options of a read, to catch N+1 queries in
+    # development and tests
+    CRUD_RAISE_ON_LAZY_LOAD: bool = config("CRUD_RAISE_ON_LAZY_LOAD", default=False)
+
+
+class ProxySettings(BaseSettings):
+    """
+    Settings for the reverse proxies in front of the application
+    """
+
+    # Comma separated networks (CIDR notation) of the proxies trusted to report the client address
+    TRUSTED_PROXIES: str = config("TRUSTED_PROXIES", default="")
+    TRUSTED_PROXIES_CACHE_SIZE: int = config("TRUSTED_PROXIES_CACHE_SIZE", default=1024)
+    # Header the trusted proxies write the client address to: x-forwarded-for or forwarded. The other one is ignored,
+    # as proxies pass it on from the client unchanged
+    TRUSTED_PROXIES_HEADER: str = config("TRUSTED_PROXIES_HEADER", default="x-forwarded-for")
+
+
+class MetricsSettings(BaseSettings):
+    """
+    Settings for the metrics endpoint
+    """
+
+    # Serve the metrics on /metrics. They reveal routes, traffic and internals, so either keep the endpoint away from
+    # the public (e.g. at the proxy) or require a bearer token
+    METRICS_ENABLED: bool = config("METRICS_ENABLED", default=False)
+    METRICS_TOKEN: str | None = config("METRICS_TOKEN", default=None)
+    # Seconds between the collections of the statistics of other components, with several worker processes (the
+    # directory they share their metrics through is set by PROMETHEUS_MULTIPROC_DIR in the gunicorn config)
+    METRICS_COLLECT_INTERVAL: float = config("METRICS_COLLECT_INTERVAL", default=1.0)
+
+
 class EnvironmentOption(Enum):
     """
     Environment Options
@@ -78,6 +152,10 @@ class Settings(
     AppSettings,
     PostgresSettings,
     RedisQueueSettings,
+    EntityCacheSettings,
+    CrudSettings,
+    ProxySettings,
+    MetricsSettings,
     EnvironmentSettings,
 ):
     """
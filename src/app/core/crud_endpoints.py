@@ -1,20 +1,36 @@
 import uuid
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import datetime
 from enum import Enum
 from inspect import Parameter, Signature
 from typing import Annotated, TypeVar
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from arq.jobs import JobStatus
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi_async_sqlalchemy import db
 from fastapi_filter import FilterDepends  # noqa  # Must be imported for makefun to work
 from fastapi_pagination import Page
 from makefun import with_signature
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
+from sqlalchemy.orm.interfaces import ORMOption
 
 from app.crud.base import CRUDBase
+from app.crud.batch import BatchResult
+from app.crud.cache import CachedEntity
+from app.crud.count import CountStrategy
+from app.crud.pagination import CursorPage
 from app.models.base import Base
+from app.schemas.job import JobSchema
+from app.schemas.mixins import sparse_model
 
+from .conditional import Validators, is_conditional, not_modified
+from .db import served_by_replica
+from .fields import json_response, parse_fields
 from .logger import FastAPIStructLogger
+from .queue import enqueue_job, get_job_status
+from .singleflight import SingleFlightRoute
+from .streaming import StreamFormat, encode_chunks
 
 ModelType = TypeVar("ModelType", bound=Base)
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
@@ -22,6 +38,9 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 FilterSchemaType = TypeVar("FilterSchemaType", bound=BaseModel)
 
+READ_ENDPOINTS = {"read", "read_all", "read_batch", "read_deleted", "read_paginated"}
+FIELDS_DESCRIPTION = "Comma separated list of fields to return, all fields if omitted."
+
 
 class CrudEndpointCreator:
     def __init__(
@@ -32,13 +51,71 @@ class CrudEndpointCreator:
         create_schema: type[CreateSchemaType],
         update_schema: type[UpdateSchemaType],
         filter_schema: type[FilterSchemaType] | None = None,
+        cursor_pagination: bool = False,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        stream_format: StreamFormat | None = None,
+        stream_yield_per: int = 1000,
+        batch_chunk_size: int = 1000,
+        batch_read_limit: int = 100,
+        conditional_requests: bool = True,
+        loader_options: dict[str, Sequence[ORMOption]] | None = None,
+        purge_batch_size: int = 10000,
+        purge_pause: float = 0.0,
+        single_flight: bool = True,
+        single_flight_stale_ttl: float = 0.0,
+        fast_serialization: bool = True,
     ):
+        """
+        Generates CRUD endpoints for a model.
+
+        **Parameters**
+
+        * `cursor_pagination`: Use keyset (cursor) pagination instead of offset pagination for the paginated
+          endpoint. Recommended for large tables, as deep pages stay as cheap as the first one.
+        * `count_strategy`: How the total of the offset paginated endpoint is counted, see `CountStrategy`.
+        * `stream_format`: Stream the "/all" and "/deleted" endpoints as NDJSON or JSON array, reading rows through a
+          server-side cursor in chunks of `stream_yield_per`. Memory usage then no longer grows with the table size.
+        * `batch_chunk_size`: Number of rows written per statement by the "/batch" endpoints.
+        * `batch_read_limit`: Maximum number of ids to read at once from the "/batch" endpoint.
+        * `conditional_requests`: Send ETag and Last-Modified headers (derived from `updated_at`) on the single item
+          and paginated endpoints, and answer matching If-None-Match / If-Modified-Since requests with a 304.
+        * `loader_options`: Loader options per read endpoint (one of `READ_ENDPOINTS`), e.g.
+          `{"read": [selectinload(Hero.ability)]}`. Endpoints not listed use the defaults of the CRUD object.
+        * `purge_batch_size`, `purge_pause`: Rows deleted per transaction by the purge job, and seconds to wait
+          between these transactions.
+        * `single_flight`: Answer identical concurrent requests to the read endpoints with one shared response, so
+          that bursts of the same request run only one query. See `SingleFlightRoute`.
+        * `single_flight_stale_ttl`: Seconds a shared response may be served to requests arriving while the next
+          identical request is still running, instead of making them wait for it.
+        * `fast_serialization`: Serialise the responses of the read endpoints to JSON bytes in one pass of the
+          Pydantic serialiser, instead of FastAPI's validation, `jsonable_encoder` and `json.dumps`.
+        """
         self.crud = crud
         self.model = model
         self.schema = schema
         self.create_schema = create_schema
         self.update_schema = update_schema
         self.filter_schema = filter_schema
+        self.cursor_pagination = cursor_pagination
+        self.count_strategy = count_strategy
+        self.stream_format = stream_format
+        self.stream_yield_per = stream_yield_per
+        self.batch_chunk_size = batch_chunk_size
+        self.batch_read_limit = batch_read_limit
+        self.conditional_requests = conditional_requests and hasattr(
+            model, "updated_at"
+        )
+        self.loader_options = loader_options or {}
+        self.purge_batch_size = purge_batch_size
+        self.purge_pause = purge_pause
+        self.fast_serialization = fast_serialization
+        self.read_route_class = (
+            SingleFlightRoute.configure(single_flight_stale_ttl)
+            if single_flight
+            else None
+        )
+        if unknown := set(self.loader_options) - READ_ENDPOINTS:
+            raise ValueError(f"Loader options for unknown endpoints: {unknown}")
 
         # Construct endpoint parameter signatures for makefun depending on the presence of a filter schema
         self.parameters = [
@@ -63,32 +140,145 @@ class CrudEndpointCreator:
 
         async def endpoint(
             log: Annotated[FastAPIStructLogger, Depends()],
+            request: Request,
+            response: Response,
             id: uuid.UUID,
+            fields: Annotated[str | None, Query(description=FIELDS_DESCRIPTION)] = None,
         ):
             log.bind(db_model=self.model.__name__, db_id=id)
             log.info("Reading a single database entry using CRUD read endpoint")
-            item = await self.crud.get(db.session, id)
+            selected = self._parse_fields(log, fields)
+            cache = self.crud.cache
+            # The cache holds full representations only
+            if selected is None and cache is not None and cache.enabled:
+                entity = await cache.get(self.model.__name__, id)
+                if entity is not None:
+                    log.info("Database entry served from the entity cache")
+                    validators = self._entity_validators(id, entity.updated_at)
+                    if validators and validators.is_not_modified(request):
+                        return not_modified(validators)
+                    return Response(
+                        entity.data,
+                        media_type="application/json",
+                        headers=validators.headers if validators else None,
+                    )
+
+            # Taken before reading, so that the entity is not cached if a write invalidates it meanwhile
+            cache_version = (
+                cache.version(self.model.__name__) if cache is not None else 0
+            )
+
+            if self.conditional_requests and is_conditional(request):
+                # Decide on the preconditions by the version of the row, without loading or serialising it
+                version = await self.crud.get_version(db.session, id)
+                if version is not None:
+                    validators = self._entity_validators(
+                        id, version.updated_at, selected
+                    )
+                    if validators.is_not_modified(request):
+                        log.info("Database entry not modified")
+                        return not_modified(validators)
+
+            item = await self.crud.get(
+                db.session,
+                id,
+                options=self.loader_options.get("read"),
+                columns=self._columns(selected),
+            )
             if not item:  # pragma: no cover
                 log.warning("Item not found in the database")
                 raise HTTPException(status_code=404, detail="Item not found")
             log.info("Database entry read successfully")
+            updated_at = getattr(item, "updated_at", None)
+            validators = self._entity_validators(id, updated_at, selected)
+            headers = validators.headers if validators else None
+            if selected is None and cache is not None and cache.enabled:
+                entity = CachedEntity(
+                    self.schema.model_validate(item).model_dump_json().encode(),
+                    updated_at,
+                )
+                # Replicas may lag behind, so their reads would put stale entities into the cache
+                if not served_by_replica(db.session):
+                    await cache.set(
+                        self.model.__name__, id, entity, version=cache_version
+                    )
+                return Response(
+                    entity.data, media_type="application/json", headers=headers
+                )
+            if selected is not None or self.fast_serialization:
+                return json_response(self._schema(selected), item, headers=headers)
+            if headers:
+                response.headers.update(headers)
             return item  # pragma: no cover
 
         return endpoint
 
+    def _entity_validators(
+        self,
+        id: uuid.UUID,
+        updated_at: datetime | None,
+        fields: tuple[str, ...] | None = None,
+    ) -> Validators | None:
+        if not self.conditional_requests:
+            return None
+        if fields is None:
+            return Validators.for_entity(id, updated_at)
+        # Sparse representations are distinct variants of the row, so they need ETags of their own
+        return Validators.for_entity(id, updated_at, ",".join(fields))
+
+    def _parse_fields(
+        self, log: FastAPIStructLogger, fields: str | None
+    ) -> tuple[str, ...] | None:
+        try:
+            return parse_fields(fields, self.schema, self.model)
+        except ValueError as e:
+            log.warning("Invalid field selection")
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def _schema(self, fields: tuple[str, ...] | None) -> type[BaseModel]:
+        return self.schema if fields is None else sparse_model(self.schema, fields)
+
+    def _columns(self, fields: tuple[str, ...] | None) -> list[str] | None:
+        """
+        Returns the columns to select for a sparse fieldset, including those needed for the ETag of the response.
+        """
+        if fields is None:
+            return None
+        required = ["id", "updated_at"] if self.conditional_requests else ["id"]
+        return [*fields, *(name for name in required if name not in fields)]
+
     def _read_items(self):
         """Creates an endpoint for reading all items from the database."""
 
         @with_signature(
-            Signature(self.parameters, return_annotation=Sequence[self.schema])
+            Signature(
+                self.parameters + [self._fields_parameter()],
+                return_annotation=Sequence[self.schema],
+            )
         )
         async def endpoint(*args, **kwargs):
             log = kwargs.get("log")
             log.bind(db_model=self.model.__name__)
             log.info("Reading all database entries using CRUD read endpoint")
-            items = await self.crud.get_all(db.session, kwargs.get("filter") or None)
+            fields = self._parse_fields(log, kwargs.get("fields"))
+            if self.stream_format:
+                return self._streaming_response(
+                    log,
+                    self.crud.stream_all,
+                    kwargs.get("filter") or None,
+                    self.loader_options.get("read_all"),
+                    fields,
+                )
+            items = await self.crud.get_all(
+                db.session,
+                kwargs.get("filter") or None,
+                options=self.loader_options.get("read_all"),
+                columns=self._columns(fields),
+            )
             log.bind(found_items=len(items))
             log.info("Database entries read successfully")
+            if fields is not None or self.fast_serialization:
+                return json_response(list[self._schema(fields)], items)
             return items  # pragma: no cover
 
         return endpoint
@@ -105,34 +295,203 @@ class CrudEndpointCreator:
             log = kwargs.get("log")
             log.bind(db_model=self.model.__name__)
             log.info("Reading all deleted database entries using CRUD read endpoint")
+            if self.stream_format:
+                return self._streaming_response(
+                    log,
+                    self.crud.stream_all_deleted,
+                    kwargs.get("filter") or None,
+                    self.loader_options.get("read_deleted"),
+                )
             items = await self.crud.get_all_deleted(
-                db.session, kwargs.get("filter") or None
+                db.session,
+                kwargs.get("filter") or None,
+                options=self.loader_options.get("read_deleted"),
             )
             log.bind(found_items=len(items))
             log.info("Database entries read successfully")
+            if self.fast_serialization:
+                return json_response(list[self.schema], items)
             return items  # pragma: no cover
 
         return endpoint
 
+    def _streaming_response(
+        self,
+        log: FastAPIStructLogger,
+        stream: Callable[..., AsyncIterator[Sequence[ModelType]]],
+        query_filter: FilterSchemaType | None,
+        options: Sequence[ORMOption] | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> StreamingResponse:
+        """Wraps a chunked CRUD stream into a streaming response of the configured format."""
+
+        schema = self._schema(fields)
+
+        async def content():
+            # The request session is closed before the response body is sent, so streaming uses a session of its own
+            found_items = 0
+            async with db():
+
+                async def chunks():
+                    nonlocal found_items
+                    async for chunk in stream(
+                        db.session,
+                        query_filter,
+                        yield_per=self.stream_yield_per,
+                        options=options,
+                        columns=self._columns(fields),
+                    ):
+                        found_items += len(chunk)
+                        yield chunk
+
+                async for data in encode_chunks(chunks(), schema, self.stream_format):
+                    yield data
+            log.bind(found_items=found_items)
+            log.info("Database entries streamed successfully")
+
+        return StreamingResponse(content(), media_type=self.stream_format.media_type)
+
+    @staticmethod
+    def _fields_parameter() -> Parameter:
+        """Parameter selecting a sparse fieldset of the response."""
+        return Parameter(
+            "fields",
+            kind=Parameter.POSITIONAL_OR_KEYWORD,
+            annotation=Annotated[str | None, Query(description=FIELDS_DESCRIPTION)],
+            default=None,
+        )
+
+    @staticmethod
+    def _conditional_parameters() -> list[Parameter]:
+        """Parameters giving endpoints access to the request preconditions and response headers."""
+        return [
+            Parameter(
+                "request", kind=Parameter.POSITIONAL_OR_KEYWORD, annotation=Request
+            ),
+            Parameter(
+                "response", kind=Parameter.POSITIONAL_OR_KEYWORD, annotation=Response
+            ),
+        ]
+
     def _read_paginated(self):
         """Creates an endpoint for reading multiple items from the database with pagination."""
+        if self.cursor_pagination:
+            return self._read_cursor_paginated()
+        parameters = (
+            self._conditional_parameters()
+            + self.parameters
+            + [
+                Parameter(
+                    "include_total",
+                    kind=Parameter.POSITIONAL_OR_KEYWORD,
+                    annotation=Annotated[bool, Query()],
+                    default=True,
+                ),
+                self._fields_parameter(),
+            ]
+        )
+
+        @with_signature(
+            func_signature=Signature(parameters, return_annotation=Page[self.schema]),
+            func_name="read_paginated",
+        )
+        async def endpoint(*args, **kwargs):
+            log = kwargs.get("log")
+            log.bind(db_model=self.model.__name__)
+            log.info("Reading multiple database entries using CRUD read endpoint")
+            fields = self._parse_fields(log, kwargs.get("fields"))
+            page = await self.crud.get_paginated(
+                db.session,
+                kwargs.get("filter") or None,
+                count_strategy=self.count_strategy,
+                include_total=kwargs.get("include_total"),
+                options=self.loader_options.get("read_paginated"),
+                columns=self._columns(fields),
+            )
+            return self._page_response(
+                kwargs, page, Page, fields, page.total, page.page, page.size
+            )
+
+        return endpoint
+
+    def _read_cursor_paginated(self):
+        """Creates an endpoint for reading multiple items from the database with keyset pagination."""
+        parameters = (
+            self._conditional_parameters()
+            + self.parameters
+            + [
+                Parameter(
+                    "cursor",
+                    kind=Parameter.POSITIONAL_OR_KEYWORD,
+                    annotation=Annotated[str | None, Query()],
+                    default=None,
+                ),
+                Parameter(
+                    "size",
+                    kind=Parameter.POSITIONAL_OR_KEYWORD,
+                    annotation=Annotated[int, Query(ge=1, le=100)],
+                    default=50,
+                ),
+                self._fields_parameter(),
+            ]
+        )
 
         @with_signature(
             func_signature=Signature(
-                self.parameters, return_annotation=Page[self.schema]
+                parameters, return_annotation=CursorPage[self.schema]
             ),
             func_name="read_paginated",
         )
         async def endpoint(*args, **kwargs):
             log = kwargs.get("log")
             log.bind(db_model=self.model.__name__)
-            log.info("Reading multiple database entries using CRUD read endpoint")
-            return await self.crud.get_paginated(
-                db.session, kwargs.get("filter") or None
+            log.info("Reading multiple database entries using CRUD cursor endpoint")
+            fields = self._parse_fields(log, kwargs.get("fields"))
+            try:
+                page = await self.crud.get_keyset_paginated(
+                    db.session,
+                    kwargs.get("filter") or None,
+                    cursor=kwargs.get("cursor"),
+                    size=kwargs.get("size"),
+                    options=self.loader_options.get("read_paginated"),
+                    columns=self._columns(fields),
+                )
+            except ValueError as e:
+                log.warning("Invalid pagination cursor or ordering")
+                raise HTTPException(status_code=400, detail=str(e))
+            return self._page_response(
+                kwargs, page, CursorPage, fields, page.next_cursor
             )
 
         return endpoint
 
+    def _page_response(
+        self,
+        kwargs: dict,
+        page: BaseModel,
+        page_type: type[BaseModel],
+        fields: tuple[str, ...] | None,
+        *extra,
+    ):
+        """
+        Returns a page, as sparse fieldset if `fields` are selected, or a 304 response if it matches the
+        preconditions of the request. `extra` holds the page metadata that is part of the response besides its items.
+        """
+        headers = None
+        if self.conditional_requests:
+            if fields is not None:
+                extra = (*extra, ",".join(fields))
+            validators = Validators.for_collection(page.items, *extra)
+            if validators.is_not_modified(kwargs.get("request")):
+                kwargs.get("log").info("Database entries not modified")
+                return not_modified(validators)
+            headers = validators.headers
+        if fields is not None or self.fast_serialization:
+            return json_response(page_type[self._schema(fields)], page, headers=headers)
+        if headers:
+            kwargs.get("response").headers.update(headers)
+        return page
+
     def _create_item(self):
         """Creates an endpoint for creating items in the database."""
 
@@ -161,17 +520,118 @@ class CrudEndpointCreator:
             log.bind(db_model=self.model.__name__, db_id=id)
             log.info("Updating a database entry using CRUD update endpoint")
             log.debug("Data has been passed to the endpoint", data=item.dict())
-            # Verify existence of the item
-            item_exists = await self.crud.exists(db.session, id)
-            if not item_exists:  # pragma: no cover
+            try:
+                updated_entry = await self.crud.update(db.session, id, item)
+            except ValueError:  # pragma: no cover
                 log.warning("Item not found in the database")
                 raise HTTPException(status_code=404, detail="Item not found")
-            updated_entry = await self.crud.update(db.session, id, item)
             log.info("Database entry updated successfully")
             return updated_entry
 
         return endpoint
 
+    def _read_batch(self):
+        """Creates an endpoint for reading multiple items by their ids at once."""
+
+        async def endpoint(
+            log: Annotated[FastAPIStructLogger, Depends()],
+            ids: Annotated[
+                str, Query(description="Comma separated list of ids to read.")
+            ],
+            fields: Annotated[str | None, Query(description=FIELDS_DESCRIPTION)] = None,
+        ) -> list[self.schema]:
+            selected = self._parse_fields(log, fields)
+            try:
+                parsed = [uuid.UUID(id.strip()) for id in ids.split(",") if id.strip()]
+            except ValueError:
+                log.warning("Invalid ids for batch read")
+                raise HTTPException(status_code=400, detail="Invalid ids")
+            if len(parsed) > self.batch_read_limit:
+                log.warning("Too many ids for batch read")
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"At most {self.batch_read_limit} ids can be read at once",
+                )
+            log.bind(db_model=self.model.__name__, batch_size=len(parsed))
+            log.info("Reading database entries using CRUD batch read endpoint")
+            items = await self.crud.get_many(
+                db.session,
+                parsed,
+                options=self.loader_options.get("read_batch"),
+                columns=self._columns(selected),
+            )
+            log.bind(found_items=len(items))
+            log.info("Database entries read successfully")
+            if selected is not None or self.fast_serialization:
+                return json_response(list[self._schema(selected)], items)
+            return items  # pragma: no cover
+
+        return endpoint
+
+    def _create_items(self):
+        """Creates an endpoint for creating multiple items in the database at once."""
+
+        async def endpoint(
+            log: Annotated[FastAPIStructLogger, Depends()],
+            items: list[self.create_schema] = Body(...),
+        ) -> BatchResult[self.schema]:
+            log.bind(db_model=self.model.__name__, batch_size=len(items))
+            log.info("Creating database entries using CRUD batch create endpoint")
+            result = await self.crud.create_many(
+                db.session, items, chunk_size=self.batch_chunk_size
+            )
+            log.bind(created_items=len(result.items), failed_items=len(result.errors))
+            log.info("Database entries created")
+            return result
+
+        return endpoint
+
+    def _update_items(self):
+        """Creates an endpoint for updating multiple existing items in the database at once."""
+        batch_update_schema = create_model(
+            f"Batch{self.update_schema.__name__}",
+            __base__=self.update_schema,
+            id=(uuid.UUID, ...),
+        )
+
+        async def endpoint(
+            log: Annotated[FastAPIStructLogger, Depends()],
+            items: list[batch_update_schema] = Body(...),
+        ) -> BatchResult[uuid.UUID]:
+            log.bind(db_model=self.model.__name__, batch_size=len(items))
+            log.info("Updating database entries using CRUD batch update endpoint")
+            result = await self.crud.update_many(
+                db.session,
+                [
+                    (item.id, item.model_dump(exclude_unset=True, exclude={"id"}))
+                    for item in items
+                ],
+                chunk_size=self.batch_chunk_size,
+            )
+            log.bind(updated_items=len(result.items), failed_items=len(result.errors))
+            log.info("Database entries updated")
+            return result
+
+        return endpoint
+
+    def _delete_items(self):
+        """Creates an endpoint for deleting multiple items from the database at once."""
+
+        async def endpoint(
+            log: Annotated[FastAPIStructLogger, Depends()],
+            ids: list[uuid.UUID] = Body(...),
+        ) -> BatchResult[uuid.UUID]:
+            log.bind(db_model=self.model.__name__, batch_size=len(ids))
+            log.info("Deleting database entries using CRUD batch delete endpoint")
+            result = await self.crud.delete_many(
+                db.session, ids, chunk_size=self.batch_chunk_size
+            )
+            log.bind(deleted_items=len(result.items), failed_items=len(result.errors))
+            log.info("Database entries deleted")
+            return result
+
+        return endpoint
+
     def _delete_item(self):
         """Creates an endpoint for deleting an item from the database."""
 
@@ -181,7 +641,11 @@ class CrudEndpointCreator:
         ):
             log.bind(db_model=self.model.__name__, db_id=id)
             log.info("Deleting a database entry using CRUD delete endpoint")
-            await self.crud.delete(db.session, id)
+            try:
+                await self.crud.delete(db.session, id)
+            except ValueError:  # pragma: no cover
+                log.warning("Item not found in the database")
+                raise HTTPException(status_code=404, detail="Item not found")
             log.info("Database entry deleted successfully")
             return {"message": "Item deleted successfully"}  # pragma: no cover
 
@@ -231,16 +695,41 @@ class CrudEndpointCreator:
 
     def _purge_all(self):
         """
-        Creates an endpoint for purging a soft-deleted item from the database.
+        Creates an endpoint for purging all soft-deleted items from the database in a background job.
         """
 
         async def endpoint(
             log: Annotated[FastAPIStructLogger, Depends()],
-        ):
+        ) -> JobSchema:
             log.bind(db_model=self.model.__name__)
-            log.info("Purging all soft-deleted database entries")
-            await self.crud.purge_all(db.session)
-            log.info("All soft-deleted database entries purged successfully")
+            log.info("Enqueueing purge of all soft-deleted database entries")
+            job = await enqueue_job(
+                "purge_deleted",
+                self.model.__name__,
+                batch_size=self.purge_batch_size,
+                pause=self.purge_pause,
+            )
+            log.bind(job_id=job.job_id)
+            log.info("Purge of all soft-deleted database entries enqueued")
+            return JobSchema(job_id=job.job_id, status=JobStatus.queued)
+
+        return endpoint
+
+    def _purge_status(self):
+        """
+        Creates an endpoint for reading the status of a purge job.
+        """
+
+        async def endpoint(
+            log: Annotated[FastAPIStructLogger, Depends()],
+            job_id: str,
+        ) -> JobSchema:
+            log.bind(db_model=self.model.__name__, job_id=job_id)
+            status, progress = await get_job_status(job_id)
+            if status == JobStatus.not_found:
+                log.warning("Purge job not found")
+                raise HTTPException(status_code=404, detail="Job not found")
+            return JobSchema(job_id=job_id, status=status, progress=progress)
 
         return endpoint
 
@@ -251,25 +740,83 @@ class CrudEndpointCreator:
             "/all",
             self._read_items(),
             methods=["GET"],
+            route_class_override=self.read_route_class,
             tags=tags,
             description=f"Read all {self.model.__name__} rows from the database.",
             operation_id=f"get_all_{self.model.__name__.lower()}",
             summary=f"Read all {self.model.__name__}",
         )
+        router.add_api_route(
+            "/batch",
+            self._read_batch(),
+            methods=["GET"],
+            route_class_override=self.read_route_class,
+            tags=tags,
+            description=(
+                f"Read multiple {self.model.__name__} rows by their ids at once, in the order of the ids."
+                " Ids without a row are skipped."
+            ),
+            operation_id=f"get_batch_{self.model.__name__.lower()}",
+            summary=f"Read multiple {self.model.__name__}",
+        )
+        router.add_api_route(
+            "/batch",
+            self._create_items(),
+            methods=["POST"],
+            tags=tags,
+            description=f"Create multiple {self.model.__name__} rows in the database at once.",
+            operation_id=f"create_batch_{self.model.__name__.lower()}",
+            summary=f"Create multiple {self.model.__name__}",
+        )
+        router.add_api_route(
+            "/batch",
+            self._update_items(),
+            methods=["PATCH"],
+            tags=tags,
+            description=f"Update multiple {self.model.__name__} rows in the database at once.",
+            operation_id=f"update_batch_{self.model.__name__.lower()}",
+            summary=f"Update multiple {self.model.__name__}",
+        )
+        router.add_api_route(
+            "/batch",
+            self._delete_items(),
+            methods=["DELETE"],
+            tags=tags,
+            description=(
+                f"Delete multiple {self.model.__name__} rows from the database at once. Will soft"
+                " delete if model has deleted_at field."
+            ),
+            operation_id=f"delete_batch_{self.model.__name__.lower()}",
+            summary=f"Delete multiple {self.model.__name__}",
+        )
         if hasattr(self.model, "is_deleted"):
             router.add_api_route(
                 "/purge",
                 self._purge_all(),
                 methods=["DELETE"],
+                status_code=202,
                 tags=tags,
-                description=f"Purge all soft-deleted {self.model.__name__} items.",
+                description=(
+                    f"Purge all soft-deleted {self.model.__name__} items in a background job."
+                    " Returns the job, whose progress can be read from /purge/{job_id}."
+                ),
                 operation_id=f"purge_all_{self.model.__name__.lower()}",
                 summary=f"Purge all soft-deleted {self.model.__name__}",
             )
+            router.add_api_route(
+                "/purge/{job_id}",
+                self._purge_status(),
+                methods=["GET"],
+                tags=tags,
+                description=f"Read the status of a job purging soft-deleted {self.model.__name__} items.",
+                operation_id=f"get_purge_status_{self.model.__name__.lower()}",
+                summary=f"Read the status of a {self.model.__name__} purge",
+            )
             router.add_api_route(
                 "/deleted",
                 self._read_deleted(),
                 methods=["GET"],
+                route_class_override=self.read_route_class,
                 tags=tags,
                 description=f"Read all deleted {self.model.__name__} objects",
                 operation_id=f"get_deleted_{self.model.__name__.lower()}",
@@ -297,6 +844,8 @@ class CrudEndpointCreator:
             "/{id}",
             self._read_item(),
             methods=["GET"],
+            route_class_override=self.read_route_class,
+            response_model=self.schema,
             tags=tags,
             description=f"Read a single {self.model.__name__} row from the database.",
             operation_id=f"get_{self.model.__name__.lower()}",
@@ -327,6 +876,7 @@ class CrudEndpointCreator:
             "",
             self._read_paginated(),
             methods=["GET"],
+            route_class_override=self.read_route_class,
             tags=tags,
             description=f"Read paginated {self.model.__name__} rows from the database.",
             operation_id=f"get_paginated_{self.model.__name__.lower()}",
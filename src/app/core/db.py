@@ -0,0 +1,113 @@
+"""
+Routing of database sessions between the primary and read replicas.
+"""
+
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import StrEnum
+from itertools import count
+from typing import Any
+
+from sqlalchemy import Delete, Insert, Update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+_read_only: ContextVar[bool] = ContextVar("read_only", default=False)
+
+
+class ReplicaStrategy(StrEnum):
+    """
+    How a replica is chosen for a session:
+
+    * `round_robin`: Cycles through the replicas.
+    * `least_connections`: Picks the replica with the fewest connections currently checked out of its pool.
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_CONNECTIONS = "least_connections"
+
+
+class ReplicaPool:
+    """
+    The engines of all read replicas, together with the strategy to choose between them.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], strategy: ReplicaStrategy = ReplicaStrategy.ROUND_ROBIN):
+        self.engines = list(engines)
+        self.strategy = strategy
+        self._counter = count()
+
+    def choose(self) -> AsyncEngine:
+        if self.strategy == ReplicaStrategy.LEAST_CONNECTIONS:
+            return min(self.engines, key=lambda engine: engine.pool.checkedout())
+        return self.engines[next(self._counter) % len(self.engines)]
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+replicas: ReplicaPool | None = None
+
+
+def create_replica_pool(
+    uris: Sequence[str], strategy: ReplicaStrategy = ReplicaStrategy.ROUND_ROBIN, **engine_args: Any
+) -> None:
+    global replicas
+    replicas = ReplicaPool([create_async_engine(uri, **engine_args) for uri in uris], strategy)
+
+
+async def close_replica_pool() -> None:
+    global replicas
+    if replicas is not None:
+        await replicas.dispose()
+        replicas = None
+
+
+def is_read_only() -> bool:
+    return _read_only.get()
+
+
+def served_by_replica(session: AsyncSession) -> bool:
+    """
+    Whether the session has read from a replica, whose data may lag behind the primary.
+    """
+    return session.info.get("replica") is not None
+
+
+@contextmanager
+def read_only(enabled: bool = True) -> Iterator[None]:
+    """
+    Marks the database access within the block as read-only (or not), which allows routing it to a replica.
+    """
+    token = _read_only.set(enabled)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    Session sending the statements of read-only requests to a read replica, all others to the primary.
+
+    A session sticks to the replica chosen for its first read. It is pinned to the primary as soon as it writes (or
+    locks rows), so that reads after a write within the same session see that write. Textual SQL is treated as a read.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any):
+        if replicas is None or not _read_only.get() or self.info.get("pinned_to_primary"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if (
+            self._flushing
+            or isinstance(clause, Insert | Update | Delete)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            self.info["pinned_to_primary"] = True
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.choose().sync_engine
+        return self.info["replica"]
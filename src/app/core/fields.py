@@ -0,0 +1,53 @@
+"""
+Sparse fieldsets: parsing of the `fields` query parameter and serialisation of projected rows.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
+
+
+@lru_cache
+def _type_adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+@lru_cache
+def selectable_fields(schema: type[BaseModel], model: Any) -> tuple[str, ...]:
+    """
+    Returns the fields of `schema` that are backed by a column of `model`, in schema order.
+    """
+    columns = set(inspect(model).column_attrs.keys())
+    return tuple(field for field in schema.model_fields if field in columns)
+
+
+def parse_fields(value: str | None, schema: type[BaseModel], model: Any) -> tuple[str, ...] | None:
+    """
+    Parses a comma separated list of fields into a tuple in schema order, or `None` if no fields were requested.
+
+    Raises a `ValueError` if the list is empty or contains fields that cannot be selected.
+    """
+    if value is None:
+        return None
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    if not requested:
+        raise ValueError("No fields selected")
+    available = selectable_fields(schema, model)
+    if unknown := requested.difference(available):
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in available if field in requested)
+
+
+def json_response(type_: Any, data: Any, headers: dict[str, str] | None = None) -> Response:
+    """
+    Validates `data` (ORM objects or rows) against `type_` and returns it as encoded JSON response.
+    """
+    adapter = _type_adapter(type_)
+    return Response(
+        adapter.dump_json(adapter.validate_python(data, from_attributes=True)),
+        media_type="application/json",
+        headers=headers,
+    )
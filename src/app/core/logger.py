@@ -1,11 +1,24 @@
+import contextvars
+import json
 import logging
-from typing import Any
+import queue
+import sys
+import threading
+from collections import Counter
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Any, TextIO
 
 import structlog
 from structlog.types import EventDict, Processor
 
 from .config import settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 def drop_color_message_key(_, __, event_dict: EventDict) -> EventDict:
     """
@@ -16,7 +29,149 @@ def drop_color_message_key(_, __, event_dict: EventDict) -> EventDict:
     return event_dict
 
 
-def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
+def add_record_timestamp(_, __, event_dict: EventDict) -> EventDict:
+    """
+    Timestamps entries of `logging` with the time they were logged at, which may be well before they are rendered
+    by the `QueuedLogHandler`.
+    """
+    record: logging.LogRecord = event_dict["_record"]
+    event_dict["timestamp"] = datetime.fromtimestamp(record.created, tz=UTC).isoformat().replace("+00:00", "Z")
+    return event_dict
+
+
+def orjson_dumps(obj: Any, default: Any = None) -> str:
+    try:
+        return orjson.dumps(obj, default=default).decode()
+    except TypeError:
+        # e.g. integers exceeding 64 bit
+        return json.dumps(obj, default=default)
+
+
+class OverflowPolicy(StrEnum):
+    """
+    What the `QueuedLogHandler` does with records logged while its queue is full:
+
+    * `drop_debug_first`: Debug records are dropped once the queue is half full, info records once it is full.
+      Warnings and errors wait for room.
+    * `block`: All records wait for room, i.e. logging is as slow as the output.
+
+    Records wait for at most the `put_timeout` of the handler, so that a stalled output cannot block the caller (e.g.
+    the event loop) for long. Records still not queued by then are dropped as well.
+    """
+
+    DROP_DEBUG_FIRST = "drop_debug_first"
+    BLOCK = "block"
+
+
+class QueuedLogHandler(logging.Handler):
+    """
+    Handler leaving the rendering and writing of records to a background thread, so that logging only costs the
+    caller (e.g. the event loop) putting the record into a bounded queue. The thread writes the records in batches of
+    up to `batch_size`, with a single write and flush each.
+
+    The records are rendered within a copy of the context they were logged in, so that processors like
+    `merge_contextvars` see the context variables of the caller. Values passed to a log call should not be mutated
+    afterwards, as they are only rendered later on.
+
+    Dropped records are counted by level in `dropped`, which is exported by `app.core.metrics.track_log_handlers()`.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        max_size: int = 10000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_DEBUG_FIRST,
+        batch_size: int = 256,
+        put_timeout: float = 0.1,
+    ):
+        super().__init__()
+        self.stream = stream or sys.stderr
+        self.max_size = max_size
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self._dropped: Counter[str] = Counter()
+        self._dropped_lock = threading.Lock()
+        self._queue: queue.Queue[tuple[contextvars.Context, logging.LogRecord] | None] = queue.Queue(max_size)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        item = (contextvars.copy_context(), record)
+        if self.overflow == OverflowPolicy.DROP_DEBUG_FIRST and record.levelno < logging.WARNING:
+            limit = self.max_size // 2 if record.levelno <= logging.DEBUG else self.max_size
+            if self._queue.qsize() >= limit:
+                self._drop(record)
+                return
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self._drop(record)
+            return
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            self._drop(record)
+
+    @property
+    def dropped(self) -> dict[str, int]:
+        with self._dropped_lock:
+            return dict(self._dropped)
+
+    def _drop(self, record: logging.LogRecord) -> None:
+        # Records are logged from any thread (e.g. those of run_in_threadpool), and += is not atomic
+        with self._dropped_lock:
+            self._dropped[record.levelname] += 1
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size and items[-1] is not None:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for item in items:
+                if item is None:
+                    break
+                context, record = item
+                try:
+                    lines.append(context.run(self.format, record))
+                except Exception:
+                    self.handleError(record)
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except Exception:
+                    self.handleError(items[0][1])
+            if items[-1] is None:
+                return
+
+    def close(self) -> None:
+        """
+        Writes the records still queued, then stops the background thread
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        super().close()
+
+
+def setup_logging(
+    json_logs: bool = False,
+    log_level: str = "INFO",
+    queue_size: int = 0,
+    overflow: OverflowPolicy = OverflowPolicy.DROP_DEBUG_FIRST,
+    queue_timeout: float = 0.1,
+):
+    """
+    Configures structlog and `logging` to render all entries with structlog.
+
+    With a `queue_size`, entries are rendered and written by a background thread (see `QueuedLogHandler`), otherwise
+    synchronously by the caller. `queue_timeout` is the number of seconds an entry waits for room in a full queue.
+    """
     timestamper = structlog.processors.TimeStamper(fmt="iso")
 
     shared_processors: list[Processor] = [
@@ -29,11 +184,16 @@ def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
         timestamper,
         structlog.processors.StackInfoRenderer(),
     ]
+    # Entries of `logging` are only timestamped when rendered, so take the time of the record instead
+    foreign_pre_chain = [
+        add_record_timestamp if processor is timestamper else processor for processor in shared_processors
+    ]
 
     if json_logs:
         # Format the exception only for JSON logs, as we want to pretty-print them when
         # using the ConsoleRenderer
         shared_processors.append(structlog.processors.format_exc_info)
+        foreign_pre_chain.append(structlog.processors.format_exc_info)
 
     structlog.configure(
         processors=shared_processors
@@ -47,14 +207,14 @@ def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
 
     log_renderer: structlog.types.Processor
     if json_logs:
-        log_renderer = structlog.processors.JSONRenderer()
+        log_renderer = structlog.processors.JSONRenderer(serializer=orjson_dumps if orjson is not None else json.dumps)
     else:
         log_renderer = structlog.dev.ConsoleRenderer()
 
     formatter = structlog.stdlib.ProcessorFormatter(
         # These run ONLY on `logging` entries that do NOT originate within
         # structlog.
-        foreign_pre_chain=shared_processors,
+        foreign_pre_chain=foreign_pre_chain,
         # These run on ALL entries after the pre_chain is done.
         processors=[
             # Remove _record & _from_structlog.
@@ -63,7 +223,11 @@ def setup_logging(json_logs: bool = False, log_level: str = "INFO"):
         ],
     )
 
-    handler = logging.StreamHandler()
+    handler = (
+        QueuedLogHandler(max_size=queue_size, overflow=overflow, put_timeout=queue_timeout)
+        if queue_size > 0
+        else logging.StreamHandler()
+    )
     # Use OUR `ProcessorFormatter` to format all `logging` entries.
     handler.setFormatter(formatter)
     root_logger = logging.getLogger()
@@ -0,0 +1,297 @@
+"""
+Prometheus metrics of the application, exposed in the text exposition format.
+
+The metrics are `prometheus_client` metrics. If `PROMETHEUS_MULTIPROC_DIR` is set (as done by the gunicorn config),
+`prometheus_client` keeps the values of each process in memory-mapped files in that directory, and the metrics
+endpoint aggregates the files of all processes. When a worker exits, the gunicorn master calls `mark_process_dead()`,
+which drops the gauges of the worker, while its counters and histograms are kept so that totals never go backwards.
+
+Some metrics are taken from the statistics of other components (e.g. the entity cache). Their collectors run on
+every render, and periodically in each process, so that the files of idle processes stay up to date.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.metrics_core import Metric
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.core import db
+from app.core.logger import QueuedLogHandler
+from app.core.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from app.crud.cache import EntityCache
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def is_multiprocess() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+class MetricsRegistry(CollectorRegistry):
+    """
+    Registry of the metrics of the application, together with the collectors updating metrics from the statistics of
+    other components. The collectors run before the metrics are read.
+    """
+
+    def __init__(self):
+        super().__init__(auto_describe=True)
+        self.collectors: dict[str, Callable[[], None]] = {}
+        self._collector_task: asyncio.Task | None = None
+        self._totals: dict[tuple[str, tuple[str, ...]], float] = {}
+
+    def add_collector(self, name: str, collector: Callable[[], None]) -> None:
+        """
+        Adds a collector, replacing the one added before under the same name
+        """
+        self.collectors[name] = collector
+
+    def run_collectors(self) -> None:
+        for collector in list(self.collectors.values()):
+            collector()
+
+    def advance(self, counter: Counter, total: float, **labels: Any) -> None:
+        """
+        Advances a counter to a total counted elsewhere, by its increase since the last call. A total lower than the
+        last one means that the source has been reset, so the counter advances by the whole total.
+        """
+        key = (counter._name, tuple(str(labels[name]) for name in counter._labelnames))
+        last = self._totals.get(key, 0.0)
+        self._totals[key] = total
+        increase = total - last if total >= last else total
+        if increase:
+            (counter.labels(**labels) if labels else counter).inc(increase)
+
+    def collect(self) -> Iterable[Metric]:
+        self.run_collectors()
+        return super().collect()
+
+    async def start(self, interval: float = 1.0) -> None:
+        """
+        Starts running the collectors every `interval` seconds, if several processes share their metrics
+        """
+        if is_multiprocess() and self._collector_task is None:
+            self._collector_task = asyncio.create_task(self._collect_periodically(interval))
+
+    async def stop(self) -> None:
+        if self._collector_task is not None:
+            self._collector_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._collector_task
+            self._collector_task = None
+        self.run_collectors()
+
+    async def _collect_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.run_collectors()
+
+    async def render(self) -> bytes:
+        """
+        Renders the metrics of all processes. Reading the files of the other processes blocks, so it runs in a worker
+        thread.
+        """
+        if not is_multiprocess():
+            return generate_latest(self)
+        self.run_collectors()
+        return await to_thread.run_sync(_render_multiprocess)
+
+
+def _render_multiprocess() -> bytes:
+    # Aggregated by a registry of its own, the metrics of this process are read from its files like the others
+    aggregated = CollectorRegistry()
+    multiprocess.MultiProcessCollector(aggregated)
+    return generate_latest(aggregated)
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Drops the gauges of an exited process. To be called by the process manager (i.e. the gunicorn master) once the
+    process is gone.
+    """
+    multiprocess.mark_process_dead(pid)
+
+
+registry = MetricsRegistry()
+
+http_requests = Counter(
+    "http_requests_total", "Number of HTTP requests handled", ["method", "route", "status"], registry=registry
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests in seconds",
+    ["method", "route"],
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+http_response_size = Histogram(
+    "http_response_size_bytes",
+    "Size of HTTP response bodies in bytes",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+    registry=registry,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Number of HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+access_log_records = Counter(
+    "access_log_records_total",
+    "Number of access log records, by whether they were logged or sampled out",
+    ["outcome"],
+    registry=registry,
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Connections of the database pools by state (checked_out, idle, overflow) and the size of the pools",
+    ["engine", "state"],
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+queue_jobs_enqueued = Counter(
+    "queue_jobs_enqueued_total",
+    "Number of jobs enqueued, or skipped as duplicates",
+    ["job", "outcome"],
+    registry=registry,
+)
+log_records_dropped = Counter(
+    "log_records_dropped_total",
+    "Number of log records dropped as the log queue was full",
+    ["level"],
+    registry=registry,
+)
+entity_cache_requests = Counter(
+    "entity_cache_requests_total",
+    "Number of entity cache lookups, by result (hit, miss)",
+    ["result"],
+    registry=registry,
+)
+entity_cache_evictions = Counter(
+    "entity_cache_evictions_total", "Number of entries evicted from the in-process entity cache", registry=registry
+)
+entity_cache_errors = Counter(
+    "entity_cache_errors_total", "Number of failed requests to the Redis tier of the entity cache", registry=registry
+)
+entity_cache_entries = Gauge(
+    "entity_cache_entries",
+    "Number of entries in the in-process entity cache",
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+single_flight_requests = Counter(
+    "single_flight_requests_total",
+    "Number of requests answered with the response of an identical request, by whether it was in flight"
+    " (shared) or recent (stale)",
+    ["outcome"],
+    registry=registry,
+)
+single_flight_in_flight = Gauge(
+    "single_flight_in_flight",
+    "Number of requests currently running on behalf of identical requests",
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+
+
+def observe_request(method: str, route: str, status_code: int, duration: float, response_size: int) -> None:
+    """
+    Records a handled request, by the path template of its route (e.g. `/api/v1/hero/{id}`), never by its actual
+    path, to keep the number of label values bounded.
+    """
+    http_requests.labels(method=method, route=route, status=status_code).inc()
+    http_request_duration.labels(method=method, route=route).observe(duration)
+    http_response_size.labels(method=method, route=route).observe(response_size)
+
+
+def track_database_pools(engine: AsyncEngine) -> None:
+    """
+    Collects the state of the connection pools of `engine` and of the read replicas (if any) before the metrics are
+    read
+    """
+
+    def observe_pool(name: str, engine: AsyncEngine) -> None:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        db_pool_connections.labels(engine=name, state="size").set(pool.size())
+        db_pool_connections.labels(engine=name, state="checked_out").set(pool.checkedout())
+        db_pool_connections.labels(engine=name, state="idle").set(pool.checkedin())
+        db_pool_connections.labels(engine=name, state="overflow").set(max(pool.overflow(), 0))
+
+    def collect() -> None:
+        observe_pool("primary", engine)
+        for index, replica in enumerate(db.replicas.engines if db.replicas is not None else []):
+            observe_pool(f"replica{index}", replica)
+
+    registry.add_collector("database_pools", collect)
+
+
+def track_entity_cache(cache: "EntityCache") -> None:
+    """
+    Collects the statistics of an entity cache before the metrics are read
+    """
+
+    def collect() -> None:
+        stats = cache.stats()
+        registry.advance(entity_cache_requests, stats["hits"], result="hit")
+        registry.advance(entity_cache_requests, stats["misses"], result="miss")
+        registry.advance(entity_cache_evictions, stats["evictions"])
+        registry.advance(entity_cache_errors, stats["errors"])
+        entity_cache_entries.set(stats["size"])
+
+    registry.add_collector("entity_cache", collect)
+
+
+def track_single_flights() -> None:
+    """
+    Collects the statistics of all single-flight registries (one per configured route class) before the metrics are
+    read
+    """
+
+    def collect() -> None:
+        stats = [single_flight.stats() for single_flight in SingleFlight.instances]
+        registry.advance(single_flight_requests, sum(stat["shared"] for stat in stats), outcome="shared")
+        registry.advance(single_flight_requests, sum(stat["stale"] for stat in stats), outcome="stale")
+        single_flight_in_flight.set(sum(stat["in_flight"] for stat in stats))
+
+    registry.add_collector("single_flights", collect)
+
+
+def track_log_handlers() -> None:
+    """
+    Collects the records dropped by the `QueuedLogHandler`s of the root logger before the metrics are read
+    """
+
+    def collect() -> None:
+        dropped: dict[str, int] = {}
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, QueuedLogHandler):
+                for level, count in handler.dropped.items():
+                    dropped[level] = dropped.get(level, 0) + count
+        for level, count in dropped.items():
+            registry.advance(log_records_dropped, count, level=level)
+
+    registry.add_collector("log_handlers", collect)
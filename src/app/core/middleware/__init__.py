@@ -1,9 +1,13 @@
+from .compression import CompressionMiddleware
 from .exceptions import ExceptionHandlerMiddleware
 from .logging import StructLogMiddleware
+from .replica import ReadReplicaMiddleware
 from .xforwarded import XForwardedMiddleware
 
 __all__ = [
+    "CompressionMiddleware",
     "ExceptionHandlerMiddleware",
+    "ReadReplicaMiddleware",
     "StructLogMiddleware",
     "XForwardedMiddleware",
 ]
@@ -0,0 +1,238 @@
+"""
+Compression of response bodies, negotiated via ``Accept-Encoding``.
+"""
+
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/x-ndjson",
+    "text/",
+)
+
+# Server-sent events must reach the client one by one, rather than held back until the minimum size is reached
+UNCOMPRESSIBLE_CONTENT_TYPES = ("text/event-stream",)
+
+
+class Encoder(ABC):
+    """
+    Incremental compressor of one response body. `compress()` returns all data compressed so far, so that each
+    chunk of a streamed response can be decoded by the client as soon as it arrives.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes: ...
+
+    @abstractmethod
+    def finish(self, data: bytes) -> bytes: ...
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    """
+    Parses an ``Accept-Encoding`` header into a mapping of (lower case) codings to their quality values.
+    """
+    accepted = {}
+    for part in value.split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, param_value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing response bodies with gzip, or with zstd or brotli if the `zstandard` or `brotli`
+    packages are installed.
+
+    The coding is negotiated via ``Accept-Encoding``: the one with the highest quality value wins, ties are decided
+    by the order zstd, brotli, gzip. Only responses with a content type in `content_types` (prefixes) and without a
+    ``Content-Encoding`` of their own are compressed, event streams never are. Complete bodies smaller than
+    `minimum_size` bytes are sent as is, streamed bodies are compressed chunk by chunk.
+
+    The outcome is stored as ``compression`` in the request state (``scope["state"]``), including the CPU time spent
+    compressing, for the access log.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: tuple[str, ...] = COMPRESSIBLE_CONTENT_TYPES,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = content_types
+        # In order of preference
+        self.encoders: dict[str, Callable[[], Encoder]] = {}
+        if zstandard is not None:
+            self.encoders["zstd"] = lambda: ZstdEncoder(zstd_level)
+        if brotli is not None:
+            self.encoders["br"] = lambda: BrotliEncoder(brotli_quality)
+        self.encoders["gzip"] = lambda: GzipEncoder(gzip_level)
+
+    def negotiate(self, accept_encoding: str) -> str | None:
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for coding in self.encoders:
+            quality = accepted.get(coding, wildcard)
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def is_compressible(self, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "")
+        if content_type.startswith(UNCOMPRESSIBLE_CONTENT_TYPES):
+            return False
+        return content_type.startswith(self.content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        pending = b""
+        encoder: Encoder | None = None
+        stats = {"encoding": coding, "original_size": 0, "compressed_size": 0, "cpu_time": 0}
+
+        def encode(body: bytes, more_body: bool) -> bytes:
+            started = time.thread_time_ns()
+            data = encoder.compress(body) if more_body else encoder.finish(body)
+            stats["cpu_time"] += time.thread_time_ns() - started
+            stats["original_size"] += len(body)
+            stats["compressed_size"] += len(data)
+            return data
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start_message, pending, encoder
+            if message["type"] == "http.response.start":
+                # Held back until enough of the body has been seen to decide whether it is worth compressing
+                start_message = message
+                return
+            if message["type"] != "http.response.body":  # pragma: no cover
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                if pending:
+                    await send({"type": "http.response.body", "body": pending, "more_body": True})
+                    pending = b""
+                await send(message)
+                return
+            if start_message is None:
+                if encoder is not None:
+                    message = {**message, "body": encode(message.get("body", b""), message.get("more_body", False))}
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start_message)
+            if not self.is_compressible(headers):
+                await send(start_message)
+                start_message = None
+                await send(message)
+                return
+
+            # Bodies are often sent in several chunks even if complete (e.g. by BaseHTTPMiddleware), so chunks are
+            # collected until either the minimum size or the end of the body is reached
+            body = pending + message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if more_body and len(body) < self.minimum_size:
+                pending = body
+                return
+            pending = b""
+
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < max(self.minimum_size, 1):
+                await send(start_message)
+                start_message = None
+                await send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+
+            encoder = self.encoders[coding]()
+            data = encode(body, more_body)
+            headers["Content-Encoding"] = coding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(data))
+            # The representation changes, so strong validators do not hold anymore
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start_message)
+            start_message = None
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            scope.setdefault("state", {})["compression"] = stats
+
+        await self.app(scope, receive, compressing_send)
+        if start_message is not None:  # pragma: no cover
+            await send(start_message)
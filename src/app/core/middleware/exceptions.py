@@ -1,24 +1,52 @@
 import structlog
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from src.app.core.config import settings
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
 
 logger = structlog.stdlib.get_logger(settings.LOG_NAME)
 
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class ExceptionHandlerMiddleware:
+    """
+    Last resort handler for exceptions raised by the middlewares and routes below it, turning them into JSON error
+    responses. Unexpected exceptions are logged.
+
+    If the response has already started (e.g. a streaming response failing halfway through), no error response
+    can be sent anymore, so the exception is logged and re-raised to let the server abort the connection.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def inner_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
+            await self.app(scope, receive, inner_send)
         except HTTPException as http_exception:
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=http_exception.status_code,
                 content={
                     "error": "Client Error",
                     "message": str(http_exception.detail),
                 },
+                headers=http_exception.headers,
             )
+            await response(scope, receive, send)
         except Exception as e:
             logger.exception(
                 "An unhandled exception was caught by last resort middleware",
@@ -26,10 +54,13 @@ class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
                 exc_info=e,
                 stack_info=settings.LOG_INCLUDE_STACK,
             )
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "error": "Internal Server Error",
                     "message": "An unexpected error occurred.",
                 },
             )
+            await response(scope, receive, send)
@@ -3,25 +3,31 @@ from typing import TypedDict
 
 import structlog
 from asgi_correlation_id import correlation_id
-from starlette.responses import JSONResponse
 from starlette.types import ASGIApp, Receive, Scope, Send
 from uvicorn.protocols.utils import get_path_with_query_string
 
 from app.core.config import settings
+from app.core.metrics import access_log_records, http_requests_in_flight, observe_request
+from app.core.sampling import AccessLogSampler, is_sampled
 
-app_logger = structlog.stdlib.get_logger(settings.LOG_NAME)
 access_logger = structlog.stdlib.get_logger(settings.LOG_ACCESS_NAME)
 
 
 class AccessInfo(TypedDict, total=False):
     status_code: int
     start_time: float
+    response_size: int
 
 
 class StructLogMiddleware:
-    def __init__(self, app: ASGIApp):
+    """
+    Writes one structured access record per request, or per sampled request if a `sampler` is given. Requests are
+    sampled by their correlation id, and the metrics cover all requests, whether sampled or not.
+    """
+
+    def __init__(self, app: ASGIApp, sampler: AccessLogSampler | None = None):
         self.app = app
-        pass
+        self.sampler = sampler
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # If the request is not an HTTP request, we don't need to do anything special
@@ -32,50 +38,50 @@ class StructLogMiddleware:
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=correlation_id.get())
 
-        info = AccessInfo()
+        # Exceptions are turned into responses by the ExceptionHandlerMiddleware. Any exception reaching this point
+        # escaped after the response had started, so the server aborts the connection.
+        info = AccessInfo(status_code=500, response_size=0)
 
         # Inner send function
         async def inner_send(message):
             if message["type"] == "http.response.start":
                 info["status_code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                info["response_size"] += len(message.get("body", b""))
             await send(message)
 
+        http_method = scope["method"]
+        http_requests_in_flight.labels(method=http_method).inc()
         try:
             info["start_time"] = time.perf_counter_ns()
             await self.app(scope, receive, inner_send)
-        except Exception as e:
-            app_logger.exception(
-                "An unhandled exception was caught by last resort middleware",
-                exception_class=e.__class__.__name__,
-                exc_info=e,
-                stack_info=settings.LOG_INCLUDE_STACK,
-            )
-            info["status_code"] = 500
-            response = JSONResponse(
-                status_code=500,
-                content={
-                    "error": "Internal Server Error",
-                    "message": "An unexpected error occurred.",
-                },
-            )
-            await response(scope, receive, send)
         finally:
-            process_time = info["start_time"] - time.perf_counter_ns()
-            client_host, client_port = scope["client"]
-            http_method = scope["method"]
-            http_version = scope["http_version"]
-            url = get_path_with_query_string(scope)
+            process_time = time.perf_counter_ns() - info["start_time"]
+            http_requests_in_flight.labels(method=http_method).dec()
+            # The route is set in the scope by the router, requests not matching any route share one label
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            observe_request(http_method, route, info["status_code"], process_time / 1e9, info["response_size"])
+
+            sample_rate = self.sampler.rate(route, info["status_code"], process_time / 1e9) if self.sampler else 1.0
+            sampled = is_sampled(correlation_id.get(), sample_rate)
+            access_log_records.labels(outcome="logged" if sampled else "sampled_out").inc()
+            if sampled:
+                client_host, client_port = scope["client"]
+                http_version = scope["http_version"]
+                url = get_path_with_query_string(scope)
 
-            # Recreate the Uvicorn access log format, but add all parameters as structured information
-            access_logger.info(
-                f"""{client_host}:{client_port} - "{http_method} {scope["path"]} HTTP/{http_version}" {info["status_code"]}""",
-                http={
-                    "url": str(url),
-                    "status_code": info["status_code"],
-                    "method": http_method,
-                    "request_id": correlation_id.get(),
-                    "version": http_version,
-                },
-                network={"client": {"ip": client_host, "port": client_port}},
-                duration=process_time,
-            )
+                # Recreate the Uvicorn access log format, but add all parameters as structured information
+                access_logger.info(
+                    f"""{client_host}:{client_port} - "{http_method} {scope["path"]} HTTP/{http_version}" {info["status_code"]}""",
+                    http={
+                        "url": str(url),
+                        "status_code": info["status_code"],
+                        "method": http_method,
+                        "request_id": correlation_id.get(),
+                        "version": http_version,
+                    },
+                    network={"client": {"ip": client_host, "port": client_port}},
+                    duration=process_time,
+                    compression=scope.get("state", {}).get("compression"),
+                    sample_rate=sample_rate,
+                )
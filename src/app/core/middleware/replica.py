@@ -0,0 +1,24 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.db import read_only
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReadReplicaMiddleware:
+    """
+    Marks requests with safe methods as read-only, so that `RoutingSession` sends their reads to a read replica.
+    Endpoints needing up-to-date data despite a safe method can opt out with `read_only(False)`.
+    """
+
+    def __init__(self, app: ASGIApp, methods: frozenset[str] = SAFE_METHODS):
+        self.app = app
+        self.methods = methods
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        with read_only():
+            await self.app(scope, receive, send)
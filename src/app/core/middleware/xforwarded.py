@@ -1,33 +1,147 @@
-"""Update the request based on ``X-Forwarded-For`` headers."""
+"""Update the request based on ``Forwarded`` and ``X-Forwarded-*`` headers."""
 
 from __future__ import annotations
 
-from copy import copy
+from collections.abc import Iterable
+from enum import StrEnum
+from functools import lru_cache
 from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network, ip_address
 
-from starlette.datastructures import Headers
 from starlette.types import ASGIApp, Receive, Scope, Send
 
-__all__ = ["XForwardedMiddleware"]
+__all__ = ["ForwardedHeader", "TrustedNetworks", "XForwardedMiddleware", "parse_forwarded"]
+
+_FORWARDED_HEADERS = frozenset({b"forwarded", b"x-forwarded-for", b"x-forwarded-proto", b"x-forwarded-host"})
+
+
+class ForwardedHeader(StrEnum):
+    """
+    Which header the trusted proxies write the forwarding chain to:
+
+    - forwarded: the standard ``Forwarded`` header (RFC 7239)
+    - x_forwarded_for: ``X-Forwarded-For`` with ``X-Forwarded-Proto`` and ``X-Forwarded-Host``
+    """
+
+    FORWARDED = "forwarded"
+    X_FORWARDED_FOR = "x-forwarded-for"
+
+
+class TrustedNetworks:
+    """Matcher of IP addresses against the networks of the trusted proxies.
+
+    The networks are compiled into one set of network prefixes per prefix
+    length, so that a lookup costs one set lookup per distinct prefix length
+    instead of one comparison per network. As the same few proxies and
+    clients send most requests, the results for the most recent addresses
+    are cached.
+
+    Parameters
+    ----------
+    networks
+        The networks of the trusted proxies.
+    cache_size
+        Number of addresses whose result is cached.
+    """
+
+    def __init__(self, networks: Iterable[IPv4Network | IPv6Network], cache_size: int = 1024) -> None:
+        self._prefixes: dict[int, dict[int, set[int]]] = {4: {}, 6: {}}
+        for network in networks:
+            prefixes = self._prefixes[network.version].setdefault(network.prefixlen, set())
+            prefixes.add(int(network.network_address) >> (network.max_prefixlen - network.prefixlen))
+        self._lengths = {version: sorted(prefixes, reverse=True) for version, prefixes in self._prefixes.items()}
+        self.contains = lru_cache(maxsize=cache_size)(self._contains)
+
+    def __bool__(self) -> bool:
+        return any(self._lengths.values())
+
+    def _contains(self, address: str) -> bool | None:
+        """Whether ``address`` is within one of the trusted networks.
+
+        Returns
+        -------
+        bool or None
+            ``None`` if ``address`` is not an IP address.
+        """
+        try:
+            ip = ip_address(address)
+        except ValueError:
+            return None
+        if isinstance(ip, IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        return self._contains_ip(ip)
+
+    def _contains_ip(self, ip: IPv4Address | IPv6Address) -> bool:
+        value = int(ip)
+        prefixes = self._prefixes[ip.version]
+        for length in self._lengths[ip.version]:
+            if value >> (ip.max_prefixlen - length) in prefixes[length]:
+                return True
+        return False
+
+
+def parse_forwarded(value: str) -> list[dict[str, str]]:
+    """Parse a ``Forwarded`` header as per RFC 7239.
+
+    Parameters
+    ----------
+    value
+        The header value.
+
+    Returns
+    -------
+    list of dict
+        One mapping of (lower case) parameter names to unquoted values per
+        element, i.e. per hop, from the left to the right.
+    """
+    elements = []
+    for element in value.split(","):
+        params = {}
+        for pair in element.split(";"):
+            name, sep, param_value = pair.partition("=")
+            if sep:
+                params[name.strip().lower()] = param_value.strip().strip('"')
+        elements.append(params)
+    return elements
+
+
+def _node_address(node: str) -> str:
+    """Strip the port of a ``for`` node of the ``Forwarded`` header."""
+    if node.startswith("["):
+        return node[1 : node.find("]")]
+    if node.count(":") == 1:
+        return node.partition(":")[0]
+    return node
 
 
 class XForwardedMiddleware:
-    """ASGI middleware to update the request based on ``X-Forwarded-For``.
+    """ASGI middleware to update the request based on ``Forwarded`` or
+    ``X-Forwarded-For``.
+
+    The remote IP address will be replaced with the right-most address of
+    the forwarding chain that is not contained within one of the trusted
+    proxy networks. The chain is walked from the right and stops at the
+    first untrusted hop. If that hop is not an IP address (e.g. an
+    obfuscated node of ``Forwarded``), the remote address is left as is.
 
-    The remote IP address will be replaced with the right-most IP address in
-    ``X-Forwarded-For`` that is not contained within one of the trusted
-    proxy networks.
+    The chain is only taken from the header the trusted proxies are
+    configured to write, the other one is ignored. Proxies usually pass on
+    the headers they don't manage, so a client could otherwise choose its
+    own address, scheme and host by sending that header.
 
-    If ``X-Forwarded-For`` is found and ``X-Forwarded-Proto`` is also present,
-    the corresponding entry of ``X-Forwarded-Proto`` is used to replace the
+    With ``Forwarded``, the scheme and host are taken from the ``proto`` and
+    ``host`` parameters of the chosen hop.
+
+    With ``X-Forwarded-For``, if ``X-Forwarded-Proto`` is also present, the
+    corresponding entry of ``X-Forwarded-Proto`` is used to replace the
     scheme in the request scope. If ``X-Forwarded-Proto`` only has one entry
     (ingress-nginx has this behavior), that one entry will become the new
-    scheme in the request scope.
+    scheme in the request scope. The contents of ``X-Forwarded-Host`` will
+    be stored as ``forwarded_host`` in the request state. Normally this is
+    not needed since NGINX will pass the original ``Host`` header without
+    modification.
 
-    The contents of ``X-Forwarded-Host`` will be stored as ``forwarded_host``
-    in the request state if it and ``X-Forwarded-For`` are present. Normally
-    this is not needed since NGINX will pass the original ``Host`` header
-    without modification.
+    If any of these headers is present more than once, we don't know which
+    one is correct, so act as if it was not present.
 
     Parameters
     ----------
@@ -35,120 +149,110 @@ class XForwardedMiddleware:
         The networks of the trusted proxies. If not specified, defaults to the
         empty list, which means only the immediately upstream proxy will be
         trusted.
+    cache_size
+        Number of recent addresses whose trust is cached.
+    header
+        The header the trusted proxies write the forwarding chain to.
     """
 
-    def __init__(self, app: ASGIApp, *, proxies: list[IPv4Network | IPv6Network] | None = None) -> None:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        proxies: list[IPv4Network | IPv6Network] | None = None,
+        cache_size: int = 1024,
+        header: ForwardedHeader = ForwardedHeader.X_FORWARDED_FOR,
+    ) -> None:
         self._app = app
-        self._proxies = proxies if proxies else []
+        self._proxies = TrustedNetworks(proxies or [], cache_size=cache_size)
+        self._header = ForwardedHeader(header)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
             await self._app(scope, receive, send)
             return
-        scope = copy(scope)
-        scope.setdefault("state", {})
-        headers = Headers(scope=scope)
-        forwarded_for = list(reversed(self._get_forwarded_for(headers)))
-        index = -1
-        if not forwarded_for:
-            scope["state"]["forwarded_host"] = None
+        state = scope.setdefault("state", {})
+        headers = self._get_headers(scope)
+
+        if self._header == ForwardedHeader.FORWARDED:
+            forwarded = headers.get(b"forwarded")
+            hops = parse_forwarded(forwarded) if forwarded else []
+            addresses = [_node_address(hop.get("for", "")) for hop in hops]
+        else:
+            forwarded_for = headers.get(b"x-forwarded-for")
+            addresses = [a.strip() for a in forwarded_for.split(",")] if forwarded_for else []
+            addresses = [address for address in addresses if address]
+        if not addresses:
+            state["forwarded_host"] = None
             await self._app(scope, receive, send)
             return
 
-        client = None
-        for n, ip in enumerate(forwarded_for):
-            if any(ip in network for network in self._proxies):
-                continue
-            client = str(ip)
-            index = n
-            break
-
-        # If all the IP addresses are from trusted networks, take the
-        # left-most.
-        if not client:
-            client = str(forwarded_for[-1])
-            index = -1
+        index = self._get_client_index(addresses)
 
         # Update the request's understanding of the client IP.
-        if scope.get("client"):
-            scope["client"] = (client, scope["client"][1])
-        else:
-            scope["client"] = (client, None)
-
-        # Ideally this should take the scheme corresponding to the entry in
-        # X-Forwarded-For that was chosen, but some proxies (the Kubernetes
-        # NGINX ingress, for example) only retain one element in
-        # X-Forwarded-Proto. In that case, use what we have.
-        proto = list(reversed(self._get_forwarded_proto(headers)))
-        if proto:
-            if index >= len(proto):
-                index = -1
-            scope["scheme"] = proto[index]
+        if self._proxies.contains(addresses[index]) is not None:
+            client = scope.get("client")
+            scope["client"] = (addresses[index], client[1] if client else None)
 
-        # Record what appears to be the client host for logging purposes.
-        scope["state"]["forwarded_host"] = self._get_forwarded_host(headers)
+        if self._header == ForwardedHeader.FORWARDED:
+            if proto := hops[index].get("proto"):
+                scope["scheme"] = proto.lower()
+            state["forwarded_host"] = hops[index].get("host")
+        else:
+            # Ideally this should take the scheme corresponding to the entry in
+            # X-Forwarded-For that was chosen, but some proxies (the Kubernetes
+            # NGINX ingress, for example) only retain one element in
+            # X-Forwarded-Proto. In that case, use what we have.
+            forwarded_proto = headers.get(b"x-forwarded-proto")
+            if forwarded_proto:
+                proto = forwarded_proto.split(",")
+                proto_index = len(proto) - len(addresses) + index
+                scope["scheme"] = proto[proto_index if proto_index >= 0 else 0].strip()
+            # Record what appears to be the client host for logging purposes.
+            forwarded_host = headers.get(b"x-forwarded-host")
+            state["forwarded_host"] = forwarded_host.strip() if forwarded_host is not None else None
 
         # Perform the rest of the request processing.
         await self._app(scope, receive, send)
-        return
 
-    def _get_forwarded_for(self, headers: Headers) -> list[IPv4Address | IPv6Address]:
-        """Retrieve the ``X-Forwarded-For`` entries from the request.
+    def _get_client_index(self, addresses: list[str]) -> int:
+        """Find the hop of the client in the forwarding chain.
 
         Parameters
         ----------
-        headers
-            Request headers.
+        addresses
+            The addresses of the chain, from the left to the right.
 
         Returns
         -------
-        list of ipaddress._BaseAddress
-            The list of addresses found in the header. If there are multiple
-            ``X-Forwarded-For`` headers, we don't know which one is correct,
-            so act as if there are no headers.
+        int
+            Index of the right-most address that is not within a trusted
+            network. If all addresses are trusted, the left-most.
         """
-        forwarded_for_str = headers.getlist("X-Forwarded-For")
-        if not forwarded_for_str or len(forwarded_for_str) > 1:
-            return []
-        return [ip_address(addr) for addr in (a.strip() for a in forwarded_for_str[0].split(",")) if addr]
-
-    def _get_forwarded_host(self, headers: Headers) -> str | None:
-        """Retrieve the ``X-Forwarded-Host`` header.
+        if not self._proxies:
+            return len(addresses) - 1
+        for index in range(len(addresses) - 1, -1, -1):
+            if not self._proxies.contains(addresses[index]):
+                return index
+        return 0
 
-        Parameters
-        ----------
-        headers
-            Request headers.
-
-        Returns
-        -------
-        str
-            The value of the ``X-Forwarded-Host`` header, if present and if
-            there is only one header. If there are multiple
-            ``X-Forwarded-Host`` headers, we don't know which one is correct,
-            so act as if there are no headers.
-        """
-        forwarded_host = headers.getlist("X-Forwarded-Host")
-        if not forwarded_host or len(forwarded_host) > 1:
-            return None
-        return forwarded_host[0].strip()
-
-    def _get_forwarded_proto(self, headers: Headers) -> list[str]:
-        """Retrieve the ``X-Forwarded-Proto`` entries from the request.
-
-        Parameters
-        ----------
-        headers
-            Request headers.
+    @staticmethod
+    def _get_headers(scope: Scope) -> dict[bytes, str]:
+        """Retrieve the forwarding headers from the request.
 
         Returns
         -------
-        list of str
-            The list of schemes found in the header. If there are multiple
-            ``X-Forwarded-Proto`` headers, we don't know which one is correct,
-            so act as if there are no headers.
+        dict
+            The value of each forwarding header present exactly once, by its
+            lower case name.
         """
-        forwarded_proto_str = headers.getlist("X-Forwarded-Proto")
-        if not forwarded_proto_str or len(forwarded_proto_str) > 1:
-            return []
-        return [p.strip() for p in forwarded_proto_str[0].split(",")]
+        found: dict[bytes, str] = {}
+        duplicates = set()
+        for name, value in scope["headers"]:
+            if name in _FORWARDED_HEADERS:
+                if name in found:
+                    duplicates.add(name)
+                found[name] = value.decode("latin-1")
+        for name in duplicates:
+            del found[name]
+        return found
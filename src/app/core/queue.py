@@ -1,7 +1,24 @@
+import json
+import pickle
+from contextvars import ContextVar
+from typing import Any
+
 from arq.connections import ArqRedis, RedisSettings, create_pool
+from arq.jobs import Job, JobStatus
+from asgi_correlation_id import correlation_id
+
+from .metrics import queue_jobs_enqueued
 
 pool: ArqRedis | None = None
 
+# Keyword argument carrying the correlation id from `enqueue_job()` to the worker, removed by `job_deserializer()`
+CORRELATION_ID_KWARG = "_correlation_id"
+
+_job_correlation_id: ContextVar[str | None] = ContextVar("job_correlation_id", default=None)
+
+# Seconds the progress of a job is kept after its last update
+JOB_PROGRESS_TTL = 24 * 60 * 60
+
 
 async def create_redis_queue_pool(settings: RedisSettings) -> None:
     global pool
@@ -13,17 +30,66 @@ async def close_redis_queue_pool() -> None:
     await pool.close()
 
 
-async def enqueue_job(job_name: str, *args, **kwargs) -> None:
+async def enqueue_job(job_name: str, *args, **kwargs) -> Job | None:
     """
     Enqueue a job in the Redis queue
-    Automatically adds the correlation_id to the job
+    Automatically adds the correlation_id to the job, that of the current request or (within a job) of the current
+    job, see `job_correlation_id()`
 
     :param job_name:
     :param args:
     :param kwargs:
-    :return:
+    :return: The enqueued job, or None if a job with the given `_job_id` already exists
+    """
+    if pool is None:
+        raise ValueError("Redis pool not initialized")
+
+    cid = correlation_id.get() or _job_correlation_id.get()
+    if cid is not None:
+        kwargs[CORRELATION_ID_KWARG] = cid
+    job = await pool.enqueue_job(job_name, *args, **kwargs)
+    queue_jobs_enqueued.labels(job=job_name, outcome="enqueued" if job is not None else "duplicate").inc()
+    return job
+
+
+def job_deserializer(data: bytes) -> dict[str, Any]:
+    """
+    Deserializer of the worker, taking the correlation id out of the keyword arguments of a job, so that job
+    functions do not receive it. The worker deserializes a job within the context `on_job_start` and the job run in,
+    so they can read it with `job_correlation_id()`.
+    """
+    job = pickle.loads(data)
+    kwargs = job.get("k")
+    if kwargs and CORRELATION_ID_KWARG in kwargs:
+        _job_correlation_id.set(kwargs.pop(CORRELATION_ID_KWARG))
+    return job
+
+
+def job_correlation_id() -> str | None:
+    """
+    Correlation id of the request that enqueued the current job, if any
+    """
+    return _job_correlation_id.get()
+
+
+def _progress_key(job_id: str) -> str:
+    return f"arq:progress:{job_id}"
+
+
+async def set_job_progress(redis: ArqRedis, job_id: str, **progress: Any) -> None:
+    """
+    Stores the progress of a running job, to be called from within the job with the redis connection of its context
+    """
+    await redis.set(_progress_key(job_id), json.dumps(progress), ex=JOB_PROGRESS_TTL)
+
+
+async def get_job_status(job_id: str) -> tuple[JobStatus, dict[str, Any] | None]:
+    """
+    Returns the status of a job, together with the progress it reported (if any)
     """
     if pool is None:
         raise ValueError("Redis pool not initialized")
 
-    await pool.enqueue_job(job_name, *args, **kwargs)
+    status = await Job(job_id, pool).status()
+    progress = await pool.get(_progress_key(job_id))
+    return status, json.loads(progress) if progress else None
@@ -0,0 +1,67 @@
+"""
+Deterministic sampling of log records, keyed on the correlation id.
+"""
+
+import hashlib
+import random
+
+
+def sample_point(key: str) -> float:
+    """
+    Position of `key` in [0, 1), the same in every process (unlike `hash()`)
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big") / 2**64
+
+
+def is_sampled(key: str | None, rate: float) -> bool:
+    """
+    Whether the records of `key` (e.g. a correlation id) are sampled at `rate`. All processes sampling at the same
+    rate make the same decision for a key, so the sampled records of a request join up with those of the jobs it
+    enqueued. A key sampled at some rate is also sampled at all higher rates. Without a key, the decision is random.
+    """
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    if key is None:
+        return random.random() < rate
+    return sample_point(key) < rate
+
+
+def parse_rates(value: str) -> dict[str, float]:
+    """
+    Parses comma separated `key=rate` pairs, e.g. `2xx=0.01,4xx=1` or `/health=0`
+    """
+    rates = {}
+    for pair in value.split(","):
+        key, sep, rate = pair.strip().rpartition("=")
+        if sep:
+            rates[key.strip()] = float(rate)
+    return rates
+
+
+class AccessLogSampler:
+    """
+    Decides at which rate the access record of a request is sampled:
+
+    * Requests taking at least `slow_threshold` seconds (if set) are always logged.
+    * Successful requests (below 400) of a route listed in `route_rates`, by its path template, use that rate.
+    * All others use the rate of their status class in `status_rates`, e.g. `{"2xx": 0.01}`, defaulting to 1.
+    """
+
+    def __init__(
+        self,
+        status_rates: dict[str, float] | None = None,
+        route_rates: dict[str, float] | None = None,
+        slow_threshold: float = 0.0,
+    ):
+        self.status_rates = {int(key[0]): rate for key, rate in (status_rates or {}).items()}
+        self.route_rates = route_rates or {}
+        self.slow_threshold = slow_threshold
+
+    def rate(self, route: str, status_code: int, duration: float) -> float:
+        if self.slow_threshold and duration >= self.slow_threshold:
+            return 1.0
+        if status_code < 400 and route in self.route_rates:
+            return self.route_rates[route]
+        return self.status_rates.get(status_code // 100, 1.0)
@@ -0,0 +1,149 @@
+"""
+Single-flight coalescing of identical concurrent GET requests.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import ClassVar, NamedTuple
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# Request headers the response may depend on, requests only share a response if these are equal
+VARY_HEADERS = ("accept", "authorization", "cookie", "if-modified-since", "if-none-match")
+
+
+class SharedResponse(NamedTuple):
+    """
+    The encoded response of a request, to be replayed to other requests
+    """
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    @classmethod
+    def of(cls, response: Response) -> "SharedResponse | None":
+        # Streamed responses cannot be replayed, and background tasks must only run once
+        if not hasattr(response, "body") or response.background is not None:
+            return None
+        return cls(response.status_code, list(response.raw_headers), response.body)
+
+    def response(self) -> Response:
+        response = Response(self.body, status_code=self.status_code)
+        response.raw_headers = list(self.headers)
+        return response
+
+
+class SingleFlight:
+    """
+    Runs only one handler per key at a time. Requests arriving while a handler for their key is running wait for
+    its response and get a copy of the encoded bytes, instead of running the handler themselves. If the handler
+    raises, the exception is raised to all of them.
+
+    With a `stale_ttl`, a successful response is kept for that many seconds. Requests arriving while its key is being
+    revalidated by another request get that response right away, instead of waiting. This never serves responses
+    without a request in flight, so it only ever adds the duration of one request to the age of a response.
+
+    All instances are kept in `instances`, for the metrics.
+    """
+
+    instances: ClassVar[weakref.WeakSet["SingleFlight"]] = weakref.WeakSet()
+
+    def __init__(self, stale_ttl: float = 0.0):
+        self.instances.add(self)
+        self.stale_ttl = stale_ttl
+        self.shared = 0
+        self.stale = 0
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self._recent: OrderedDict[Hashable, tuple[float, SharedResponse]] = OrderedDict()
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self._flights), "shared": self.shared, "stale": self.stale}
+
+    async def run(self, key: Hashable, handler: Callable[[], Awaitable[Response]]) -> Response:
+        flight = self._flights.get(key)
+        if flight is not None:
+            recent = self._recent_response(key)
+            if recent is not None:
+                self.stale += 1
+                return recent.response()
+            # Shielded, as a cancelled follower must not cancel the flight for all others
+            shared = await asyncio.shield(flight)
+            if shared is None:
+                return await handler()
+            self.shared += 1
+            return shared.response()
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            response = await handler()
+        except Exception as e:
+            flight.set_exception(e)
+            # Marks the exception as retrieved, there may be no follower to do so
+            flight.exception()
+            raise
+        except BaseException:
+            # Cancelled: followers run the handler themselves
+            flight.set_result(None)
+            raise
+        finally:
+            del self._flights[key]
+
+        shared = SharedResponse.of(response)
+        flight.set_result(shared)
+        if shared is not None and self.stale_ttl > 0 and response.status_code == 200:
+            self._remember(key, shared)
+        return response
+
+    def _recent_response(self, key: Hashable) -> SharedResponse | None:
+        entry = self._recent.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _remember(self, key: Hashable, shared: SharedResponse) -> None:
+        now = time.monotonic()
+        self._recent[key] = (now + self.stale_ttl, shared)
+        self._recent.move_to_end(key)
+        # All entries share the same TTL, so the oldest entries expire first
+        while self._recent:
+            expires_at, _ = next(iter(self._recent.values()))
+            if expires_at >= now:
+                break
+            self._recent.popitem(last=False)
+
+
+class SingleFlightRoute(APIRoute):
+    """
+    Route answering identical concurrent GET requests with one shared response, see `SingleFlight`.
+
+    Requests are identical if they have the same route, path parameters, query string (in any order of the
+    parameters) and `VARY_HEADERS`. Use `configure()` to get a route class with a flight registry of its own.
+    """
+
+    single_flight = SingleFlight()
+
+    @classmethod
+    def configure(cls, stale_ttl: float = 0.0) -> type["SingleFlightRoute"]:
+        return type(cls.__name__, (cls,), {"single_flight": SingleFlight(stale_ttl)})
+
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+            key = (
+                self.path_format,
+                tuple(sorted(request.path_params.items())),
+                urlencode(sorted(parse_qsl(request.url.query, keep_blank_values=True))),
+                tuple(request.headers.get(name) for name in VARY_HEADERS),
+            )
+            return await self.single_flight.run(key, lambda: handler(request))
+
+        return route_handler
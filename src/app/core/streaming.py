@@ -0,0 +1,57 @@
+"""
+Chunk-wise JSON encoding for streaming large result sets.
+"""
+
+from collections.abc import AsyncIterator, Sequence
+from enum import StrEnum
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+
+
+class StreamFormat(StrEnum):
+    """
+    Output format of streaming endpoints: newline delimited JSON or a single JSON array.
+    """
+
+    NDJSON = "ndjson"
+    JSON = "json"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self == StreamFormat.NDJSON else "application/json"
+
+
+@lru_cache
+def _type_adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+async def encode_chunks(
+    chunks: AsyncIterator[Sequence[Any]], schema: type[BaseModel], stream_format: StreamFormat
+) -> AsyncIterator[bytes]:
+    """
+    Validates each chunk of ORM objects against `schema` and yields it as encoded bytes, so that only a single chunk
+    is held in memory at any time.
+    """
+    adapter = _type_adapter(list[schema])
+    item_adapter = _type_adapter(schema)
+    first = True
+    if stream_format == StreamFormat.JSON:
+        yield b"["
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        items = adapter.validate_python(chunk, from_attributes=True)
+        if stream_format == StreamFormat.NDJSON:
+            yield b"".join(item_adapter.dump_json(item) + b"\n" for item in items)
+        else:
+            # Strip the brackets of the encoded list and join the chunks with commas instead
+            data = adapter.dump_json(items)[1:-1]
+            yield data if first else b"," + data
+        first = False
+
+    if stream_format == StreamFormat.JSON:
+        yield b"]"
@@ -1,5 +1,9 @@
 from app import models, schemas
+from app.core.config import settings
 
 from .base import CRUDBase
+from .cache import entity_cache
 
-crud_ability = CRUDBase[models.Ability, schemas.AbilityCreateSchema, schemas.AbilityUpdateSchema](models.Ability)
+crud_ability = CRUDBase[models.Ability, schemas.AbilityCreateSchema, schemas.AbilityUpdateSchema](
+    models.Ability, cache=entity_cache, raise_on_lazy_load=settings.CRUD_RAISE_ON_LAZY_LOAD
+)
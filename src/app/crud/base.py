@@ -1,59 +1,291 @@
-import datetime
-from collections.abc import Sequence
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from typing import Any, Generic, TypeVar
 
-from fastapi.encoders import jsonable_encoder
 from fastapi_filter.contrib.sqlalchemy import Filter
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
+from fastapi_pagination import Page, create_page, resolve_params
 from pydantic import BaseModel
-from sqlalchemy import delete, select
+from sqlalchemy import (
+    Row,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm.interfaces import ORMOption
 
 from app.models.base import Base
 
+from .batch import BatchError, BatchResult, error_detail
+from .cache import EntityCache
+from .count import CountCache, CountStrategy, filter_fingerprint, is_filtered
+from .loader import EntityLoader
+from .pagination import (
+    CursorPage,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    keyset_ordering,
+)
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: type[ModelType]):
+    def __init__(
+        self,
+        model: type[ModelType],
+        count_cache_ttl: float = 30.0,
+        cache: EntityCache | None = None,
+        loader_options: Sequence[ORMOption] = (),
+        raise_on_lazy_load: bool = False,
+    ):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
 
         **Parameters**
 
         * `model`: A SQLAlchemy model class
-        * `schema`: A Pydantic model (schema) class
+        * `count_cache_ttl`: Seconds a row count is re-used when counting with `CountStrategy.CACHED`
+        * `cache`: Entity cache for serialised rows, invalidated by all write methods
+        * `loader_options`: Default loader options of all read methods, e.g. `selectinload(Model.relationship)`
+        * `raise_on_lazy_load`: Raise on any lazy load of a relationship not covered by the loader options of a
+          read, instead of emitting another query per row
         """
         self.model = model
+        self.count_cache = CountCache(ttl=count_cache_ttl)
+        self.cache = cache
+        self.loader_options = loader_options
+        self.raise_on_lazy_load = raise_on_lazy_load
 
-    def _get(self, query_filter: Filter = None):
+    def _get(self, query_filter: Filter = None, sort: bool = True):
         sel = select(self.model)
         if query_filter:
             sel = query_filter.filter(sel)
-            sel = query_filter.sort(sel)
+            if sort:
+                sel = query_filter.sort(sel)
         if hasattr(self.model, "deleted_at"):
             return sel.filter_by(deleted_at=None)
         return sel
 
-    async def count(self, db: AsyncSession, query_filter=None) -> int:
-        return (await db.scalar(self._get(query_filter))).count()
+    def _load(
+        self,
+        query,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ):
+        """
+        Applies loader options to a read query: the given ones, or the defaults of this CRUD object if `None`.
+
+        With `columns`, only these columns are selected instead, so the query returns lightweight rows rather
+        than model instances.
+        """
+        if columns:
+            return query.with_only_columns(
+                *(getattr(self.model, name) for name in columns)
+            )
+        options = list(self.loader_options if options is None else options)
+        if self.raise_on_lazy_load:
+            options.append(raiseload("*", sql_only=True))
+        return query.options(*options) if options else query
+
+    @staticmethod
+    async def _fetch(
+        db: AsyncSession, query, columns: Sequence[str] | None = None
+    ) -> Sequence[Any]:
+        result = await db.execute(query)
+        return result.all() if columns else result.scalars().all()
 
-    async def get(self, db: AsyncSession, id: Any) -> ModelType | None:
-        return await db.scalar(self._get().filter_by(id=id))
+    async def count(
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        strategy: CountStrategy = CountStrategy.EXACT,
+    ) -> int:
+        if strategy == CountStrategy.APPROXIMATE:
+            if not is_filtered(query_filter):
+                estimate = await self._estimate_count(db)
+                if estimate is not None:
+                    return estimate
+            strategy = CountStrategy.CACHED
+
+        key = filter_fingerprint(query_filter)
+        if strategy == CountStrategy.CACHED:
+            cached = self.count_cache.get(key)
+            if cached is not None:
+                return cached
+
+        query = select(func.count()).select_from(
+            self._get(query_filter, sort=False).subquery()
+        )
+        total = await db.scalar(query)
+        if strategy == CountStrategy.CACHED:
+            self.count_cache.set(key, total)
+        return total
+
+    async def _estimate_count(self, db: AsyncSession) -> int | None:
+        """
+        Estimates the number of live rows from the planner statistics, or returns `None` if the table has not been
+        analyzed yet. For soft-delete models, the estimate is scaled by the fraction of rows without `deleted_at`.
+        """
+        table = self.model.__table__
+        row = (
+            await db.execute(
+                text(
+                    "SELECT c.reltuples, s.null_frac FROM pg_class c "
+                    "LEFT JOIN pg_stats s ON s.schemaname = c.relnamespace::regnamespace::text "
+                    "AND s.tablename = c.relname AND s.attname = 'deleted_at' "
+                    "WHERE c.oid = to_regclass(:table)"
+                ),
+                {"table": table.fullname},
+            )
+        ).first()
+        if row is None or row.reltuples < 0:
+            return None
+        if hasattr(self.model, "deleted_at"):
+            if row.null_frac is None:
+                return None
+            return round(row.reltuples * row.null_frac)
+        return round(row.reltuples)
+
+    async def get(
+        self,
+        db: AsyncSession,
+        id: Any,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> ModelType | None:
+        query = self._load(self._get().filter_by(id=id), options, columns)
+        if columns:
+            return (await db.execute(query)).first()
+        return await db.scalar(query)
+
+    async def get_many(
+        self,
+        db: AsyncSession,
+        ids: Sequence[Any],
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> list[ModelType]:
+        """
+        Reads the rows of the given ids with one query, in the order of `ids`. Ids without a row are skipped, and
+        duplicates are returned once.
+
+        The ids are sent as a single array parameter (`id = ANY(:ids)`), so the statement is the same for any
+        number of ids and can be re-used from the statement cache.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        ids_param = bindparam("ids", ids, type_=ARRAY(self.model.id.type))
+        query = self._get().where(self.model.id == any_(ids_param))
+        items = await self._fetch(db, self._load(query, options, columns), columns)
+        found = {item.id: item for item in items}
+        return [found[id] for id in ids if id in found]
+
+    async def load(self, db: AsyncSession, id: Any) -> ModelType | None:
+        """
+        Like `get()`, but concurrent calls within the same session (e.g. through `asyncio.gather`) are coalesced into
+        one `get_many()` query, see `EntityLoader`. Uses the default loader options.
+        """
+        loader = db.info.get(("loader", self))
+        if loader is None:
+            loader = db.info[("loader", self)] = EntityLoader(self, db)
+        return await loader.load(id)
+
+    async def get_version(self, db: AsyncSession, id: Any) -> Row | None:
+        """
+        Returns the `id` and `updated_at` of a row (or `None` if it does not exist) without loading the row itself.
+        """
+        sel = select(self.model.id, self.model.updated_at).filter_by(id=id)
+        if hasattr(self.model, "deleted_at"):
+            sel = sel.filter_by(deleted_at=None)
+        return (await db.execute(sel)).first()
 
     async def exists(self, db: AsyncSession, id: Any) -> bool:
         return await self.get(db, id) is not None
 
-    async def get_deleted(self, db: AsyncSession, id: Any) -> ModelType | None:
-        return await db.scalar(select(self.model).filter_by(id=id))
+    async def get_deleted(
+        self, db: AsyncSession, id: Any, options: Sequence[ORMOption] | None = None
+    ) -> ModelType | None:
+        return await db.scalar(self._load(select(self.model).filter_by(id=id), options))
 
     async def get_paginated(
-        self, db: AsyncSession, query_filter=None
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        count_strategy: CountStrategy = CountStrategy.EXACT,
+        include_total: bool = True,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
     ) -> Page[ModelType]:
-        return await paginate(db, self._get(query_filter))
+        params = resolve_params()
+        raw_params = params.to_raw_params().as_limit_offset()
+        query = (
+            self._get(query_filter).limit(raw_params.limit).offset(raw_params.offset)
+        )
+        items = await self._fetch(db, self._load(query, options, columns), columns)
+        total = (
+            await self.count(db, query_filter, count_strategy)
+            if include_total
+            else None
+        )
+        if columns:
+            # Rows do not validate against the response model of the route, which `create_page` would use
+            return Page[Any].create(items, params, total=total)
+        return create_page(items, total=total, params=params)
+
+    async def get_keyset_paginated(
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        cursor: str | None = None,
+        size: int = 50,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> "CursorPage[ModelType]":
+        """
+        Keyset (cursor) pagination ordered by the `order_by` values of the filter and the primary key.
+
+        Each page is a single range query without OFFSET and without a COUNT, so the cost of a page does not
+        depend on how deep into the result set it is. Raises a `ValueError` for invalid cursors and for
+        orderings by nullable columns.
+        """
+        ordering = keyset_ordering(self.model, query_filter)
+        query = self._get(query_filter, sort=False)
+        if cursor:
+            query = query.where(
+                keyset_condition(ordering, decode_cursor(ordering, cursor))
+            )
+        query = query.order_by(*(column.order_by() for column in ordering)).limit(
+            size + 1
+        )
+
+        if columns:
+            # The cursor is encoded from the sort columns, so these are always selected
+            columns = [
+                *columns,
+                *(column.name for column in ordering if column.name not in columns),
+            ]
+        items = await self._fetch(db, self._load(query, options, columns), columns)
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            next_cursor = encode_cursor(ordering, items[-1])
+        return CursorPage.model_construct(
+            items=items, size=size, next_cursor=next_cursor
+        )
 
     async def get_multi(
         self,
@@ -61,92 +293,469 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         query_filter: Filter = None,
         skip: int = 0,
         limit: int = 100,
+        options: Sequence[ORMOption] | None = None,
     ) -> Sequence[ModelType]:
-        return (
-            await db.scalars(self._get(query_filter).offset(skip).limit(limit))
-        ).all()
+        query = self._get(query_filter).offset(skip).limit(limit)
+        return (await db.scalars(self._load(query, options))).all()
 
     async def get_all(
-        self, db: AsyncSession, query_filter: Filter = None
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
     ) -> Sequence[ModelType]:
-        return (await db.scalars(self._get(query_filter))).all()
+        query = self._load(self._get(query_filter), options, columns)
+        return await self._fetch(db, query, columns)
 
-    async def get_all_deleted(
-        self, db: AsyncSession, query_filter: Filter = None
-    ) -> Sequence[ModelType] | None:
+    def _get_deleted(self, query_filter: Filter = None):
         query = select(self.model)
         if query_filter:
             query = query_filter.filter(query)
             query = query_filter.sort(query)
-        return (await db.scalars(query.filter(self.model.is_deleted.is_(True)))).all()
+        return query.filter(self.model.is_deleted.is_(True))
 
-    async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)  # type: ignore
+    async def get_all_deleted(
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> Sequence[ModelType] | None:
+        query = self._load(self._get_deleted(query_filter), options, columns)
+        return await self._fetch(db, query, columns)
 
-        db.add(db_obj)
+    async def stream_all(
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        yield_per: int = 1000,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> AsyncIterator[Sequence[ModelType]]:
+        """
+        Streams all rows in chunks of `yield_per` using a server-side cursor, instead of loading the full result.
+        """
+        query = self._load(self._get(query_filter), options, columns)
+        async for chunk in self._stream(db, query, yield_per, columns):
+            yield chunk
+
+    async def stream_all_deleted(
+        self,
+        db: AsyncSession,
+        query_filter: Filter = None,
+        yield_per: int = 1000,
+        options: Sequence[ORMOption] | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> AsyncIterator[Sequence[ModelType]]:
+        """
+        Streams all soft-deleted rows in chunks of `yield_per` using a server-side cursor.
+        """
+        query = self._load(self._get_deleted(query_filter), options, columns)
+        async for chunk in self._stream(db, query, yield_per, columns):
+            yield chunk
+
+    @staticmethod
+    async def _stream(
+        db: AsyncSession, query, yield_per: int, columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Sequence[ModelType]]:
+        result = await db.stream(query.execution_options(yield_per=yield_per))
+        async for partition in (result if columns else result.scalars()).partitions():
+            yield partition
+
+    async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
+        """
+        Creates a row with a single `INSERT ... RETURNING`, which also returns server side
+        defaults such as timestamps, so no refresh is needed afterwards.
+        """
+        db_obj = await db.scalar(
+            insert(self.model).values(**obj_in.model_dump()).returning(self.model)
+        )
         await db.commit()
-        await db.refresh(db_obj)
+        await self._invalidate(db_obj.id)
         return db_obj
 
+    def _update_data(self, obj_in: UpdateSchemaType | dict[str, Any]) -> dict[str, Any]:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        return {
+            field: value
+            for field, value in update_data.items()
+            if hasattr(self.model, field)
+        }
+
     async def update(
         self, db: AsyncSession, id: Any, obj_in: UpdateSchemaType | dict[str, Any]
     ) -> ModelType:
-        # Fetch data first
-        db_obj = await self.get(db, id)
+        """
+        Updates a row with a single `UPDATE ... RETURNING` statement, without loading it first.
+        Raises a `ValueError` if the row does not exist or is soft-deleted.
+        """
+        update_data = self._update_data(obj_in)
+        if not update_data:
+            db_obj = await self.get(db, id)
+        else:
+            db_obj = await db.scalar(
+                self._update_statement()
+                .where(self.model.id == id)
+                .values(**update_data)
+                .returning(self.model)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
 
         if not db_obj:
             raise ValueError("Model does not exist")
 
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.model_dump(exclude_unset=True)
-        for field in update_data:
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, update_data[field])
-
-        db.add(db_obj)
         await db.commit()
-        await db.refresh(db_obj)
+        await self._invalidate(id)
         return db_obj
 
-    async def purge_all(self, db: AsyncSession) -> None:
-        stmt = delete(self.model).where(self.model.is_deleted.is_(True))
-        await db.execute(stmt)
+    async def create_many(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[CreateSchemaType],
+        chunk_size: int = 1000,
+    ) -> BatchResult:
+        """
+        Creates all objects using one multi-row `INSERT ... RETURNING` per chunk and a single commit.
+
+        If a chunk is rejected by the database, it is retried row by row so that only the failing items are reported
+        as errors and all others are still created.
+        """
+        result = BatchResult.model_construct(items=[], errors=[])
+        id_default = self.model.__table__.c.id.default
+        for offset in range(0, len(objs_in), chunk_size):
+            rows = [
+                obj_in.model_dump() for obj_in in objs_in[offset : offset + chunk_size]
+            ]
+            # Assign primary keys up front, so the returned rows can be put back into request order
+            for row in rows:
+                if (
+                    row.get("id") is None
+                    and id_default is not None
+                    and id_default.is_callable
+                ):
+                    row["id"] = id_default.arg(None)
+            positions = {row["id"]: position for position, row in enumerate(rows)}
+
+            try:
+                async with db.begin_nested():
+                    created = (
+                        await db.scalars(insert(self.model).returning(self.model), rows)
+                    ).all()
+                result.items.extend(sorted(created, key=lambda obj: positions[obj.id]))
+            except DBAPIError:
+                for index, row in enumerate(rows, start=offset):
+                    try:
+                        async with db.begin_nested():
+                            result.items.append(
+                                await db.scalar(
+                                    insert(self.model)
+                                    .values(**row)
+                                    .returning(self.model)
+                                )
+                            )
+                    except DBAPIError as e:
+                        result.errors.append(
+                            BatchError(
+                                index=index, id=row.get("id"), detail=error_detail(e)
+                            )
+                        )
         await db.commit()
+        await self._invalidate(*(obj.id for obj in result.items))
+        return result
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[tuple[Any, UpdateSchemaType | dict[str, Any]]],
+        chunk_size: int = 1000,
+    ) -> BatchResult:
+        """
+        Updates `(id, obj_in)` pairs using one `UPDATE ... FROM unnest(...) RETURNING id` per chunk and set of
+        changed columns, and a single commit. The returned ids decide which rows were updated, so rows deleted
+        concurrently are never reported as updated. Returns the ids of the updated rows in request order; missing
+        (or soft-deleted) rows are reported as errors.
+
+        If an id is given more than once, its changes are applied in request order.
+        """
+        result = BatchResult.model_construct(items=[], errors=[])
+        for offset in range(0, len(objs_in), chunk_size):
+            chunk = list(enumerate(objs_in[offset : offset + chunk_size], start=offset))
+            changes: dict[Any, dict[str, Any]] = {}
+            for _, (id, obj_in) in chunk:
+                changes.setdefault(id, {}).update(self._update_data(obj_in))
+
+            failed: dict[Any, str] = {}
+            try:
+                async with db.begin_nested():
+                    updated = await self._update_rows(db, changes)
+            except DBAPIError:
+                # Retried row by row, so that only the failing items are reported as errors
+                updated = set()
+                for id, values in changes.items():
+                    try:
+                        async with db.begin_nested():
+                            updated |= await self._update_rows(db, {id: values})
+                    except DBAPIError as e:
+                        failed[id] = error_detail(e)
+
+            for index, (id, _) in chunk:
+                if id in updated:
+                    result.items.append(id)
+                else:
+                    detail = failed.get(id, "Model does not exist")
+                    result.errors.append(BatchError(index=index, id=id, detail=detail))
+        await db.commit()
+        await self._invalidate(*result.items)
+        return result
+
+    async def _update_rows(
+        self, db: AsyncSession, changes: dict[Any, dict[str, Any]]
+    ) -> set[Any]:
+        """
+        Applies the changes by id with one statement per set of changed columns, and returns the ids of the rows
+        which exist and are not soft-deleted. Every column is sent as a single array parameter, so the number of
+        parameters does not depend on the number of rows.
+
+        Rows without changes are only locked (`FOR SHARE`) until the end of the transaction, so that they cannot be
+        deleted before it commits.
+        """
+        groups: dict[tuple[str, ...], list[Any]] = {}
+        for id, values in changes.items():
+            groups.setdefault(tuple(sorted(values)), []).append(id)
+
+        found = set()
+        for names, ids in groups.items():
+            if not names:
+                found.update(
+                    await db.scalars(
+                        self._get()
+                        .with_only_columns(self.model.id)
+                        .where(self.model.id == any_(self._array(ids, "id")))
+                        .with_for_update(read=True)
+                    )
+                )
+                continue
+            columns = ("id", *names)
+            data = (
+                func.unnest(
+                    *(
+                        self._array(
+                            [id if name == "id" else changes[id][name] for id in ids],
+                            name,
+                        )
+                        for name in columns
+                    )
+                )
+                .table_valued(
+                    *(column(name, getattr(self.model, name).type) for name in columns)
+                )
+                .render_derived(name="data")
+            )
+            found.update(
+                await db.scalars(
+                    self._update_statement()
+                    .where(self.model.id == data.c.id)
+                    .values({getattr(self.model, name): data.c[name] for name in names})
+                    .returning(self.model.id)
+                    .execution_options(synchronize_session=False)
+                )
+            )
+        return found
+
+    def _array(self, values: list[Any], name: str):
+        """Array parameter of the values of a column."""
+        return bindparam(
+            f"{name}_values", values, type_=ARRAY(getattr(self.model, name).type)
+        )
+
+    async def delete_many(
+        self, db: AsyncSession, ids: Sequence[Any], chunk_size: int = 1000
+    ) -> BatchResult:
+        """
+        Deletes all ids using one statement per chunk and a single commit, soft deleting if the model has a
+        `deleted_at` field. Returns the ids of the deleted rows; missing (or already deleted) rows are reported as
+        errors.
+        """
+        result = BatchResult.model_construct(items=[], errors=[])
+        for offset in range(0, len(ids), chunk_size):
+            chunk = ids[offset : offset + chunk_size]
+            deleted = set(
+                await db.scalars(
+                    self._delete_statement()
+                    .where(self.model.id.in_(chunk))
+                    .returning(self.model.id)
+                    .execution_options(synchronize_session=False)
+                )
+            )
+            for index, id in enumerate(chunk, start=offset):
+                if id in deleted:
+                    result.items.append(id)
+                else:
+                    result.errors.append(
+                        BatchError(index=index, id=id, detail="Model does not exist")
+                    )
+        await db.commit()
+        await self._invalidate(*result.items)
+        return result
+
+    def _update_statement(self):
+        """UPDATE statement restricted to rows which are not soft-deleted."""
+        statement = update(self.model)
+        if hasattr(self.model, "deleted_at"):
+            statement = statement.where(self.model.deleted_at.is_(None))
+        return statement
+
+    async def purge_all(
+        self,
+        db: AsyncSession,
+        batch_size: int = 10000,
+        pause: float = 0.0,
+        progress: Callable[[int], Awaitable[None]] | None = None,
+    ) -> int:
+        """
+        Hard deletes all soft-deleted rows in batches of up to `batch_size` rows, each deleting a range of ids in a
+        transaction of its own, which keeps locks short and the WAL of each transaction bounded. `pause` seconds are
+        waited between batches, and `progress` is awaited with the number of rows purged so far after each batch.
+
+        Returns the number of purged rows.
+        """
+        purged = 0
+        lower = None
+        while True:
+            # The id of the last row of this batch is the upper bound of its range
+            bound = (
+                select(self.model.id)
+                .where(self.model.is_deleted.is_(True))
+                .order_by(self.model.id)
+                .offset(batch_size - 1)
+                .limit(1)
+            )
+            statement = delete(self.model).where(self.model.is_deleted.is_(True))
+            if lower is not None:
+                bound = bound.where(self.model.id > lower)
+                statement = statement.where(self.model.id > lower)
+            upper = await db.scalar(bound)
+            if upper is not None:
+                statement = statement.where(self.model.id <= upper)
+
+            result = await db.execute(
+                statement.execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            purged += result.rowcount
+            if progress is not None:
+                await progress(purged)
+            if upper is None:
+                break
+            lower = upper
+            if pause:
+                await asyncio.sleep(pause)
+
+        await self._invalidate_all()
+        return purged
 
     async def hard_delete(self, db: AsyncSession, id: Any) -> ModelType:
-        obj = await self.get_deleted(db, id)
+        obj = await db.scalar(
+            delete(self.model)
+            .where(self.model.id == id)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
         if not obj:
             raise ValueError("Model does not exist")
-        await db.delete(obj)
         await db.commit()
+        await self._invalidate(id)
         return obj
 
     async def restore(self, db: AsyncSession, id: Any) -> ModelType:
-        obj = await self.get_deleted(db, id)
+        if not hasattr(self.model, "deleted_at"):
+            raise ValueError("Model does not have deleted_at field")
+        obj = await db.scalar(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(deleted_at=None, is_deleted=False)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
         if not obj:
             raise ValueError("Model does not exist")
-        if hasattr(obj, "deleted_at"):
-            obj.deleted_at = None
-            obj.is_deleted = False
-            db.add(obj)
-            await db.commit()
-        else:
-            raise ValueError("Model does not have deleted_at field")
+        await db.commit()
+        await self._invalidate(id)
         return obj
 
-    async def delete(self, db: AsyncSession, id: Any) -> ModelType:
-        obj = await self.get(db, id)
-        if not obj:
+    async def delete(self, db: AsyncSession, id: Any) -> Any:
+        """
+        Deletes a row with a single statement, soft deleting if the model has a `deleted_at`
+        field. Returns the id of the deleted row, or raises a `ValueError` if it does not exist.
+        """
+        deleted_id = await db.scalar(
+            self._delete_statement()
+            .where(self.model.id == id)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        if deleted_id is None:
             raise ValueError("Model does not exist")
-        if hasattr(obj, "deleted_at"):
-            obj.deleted_at = datetime.datetime.now()
-            obj.is_deleted = True
-            db.add(obj)
-            await db.commit()
-        else:
-            await db.delete(obj)
-            await db.commit()
-        return obj
+        await db.commit()
+        await self._invalidate(id)
+        return deleted_id
+
+    async def delete_by_filter(self, db: AsyncSession, query_filter: Filter) -> int:
+        """
+        Deletes all rows matching the filter with a single statement, soft deleting if the model
+        has a `deleted_at` field. Returns the number of deleted rows.
+        """
+        return await self._execute_for_filtered(
+            db, self._delete_statement(), self._get(query_filter, sort=False)
+        )
+
+    async def restore_by_filter(self, db: AsyncSession, query_filter: Filter) -> int:
+        """
+        Restores all soft-deleted rows matching the filter with a single statement. Returns the
+        number of restored rows.
+        """
+        return await self._execute_for_filtered(
+            db,
+            update(self.model).values(deleted_at=None, is_deleted=False),
+            self._get_deleted(query_filter),
+        )
+
+    async def purge_by_filter(self, db: AsyncSession, query_filter: Filter) -> int:
+        """
+        Hard deletes all soft-deleted rows matching the filter with a single statement. Returns
+        the number of purged rows.
+        """
+        return await self._execute_for_filtered(
+            db, delete(self.model), self._get_deleted(query_filter)
+        )
+
+    async def _execute_for_filtered(self, db: AsyncSession, statement, query) -> int:
+        ids = query.with_only_columns(self.model.id).order_by(None)
+        result = await db.execute(
+            statement.where(self.model.id.in_(ids)).execution_options(
+                synchronize_session=False
+            )
+        )
+        await db.commit()
+        await self._invalidate_all()
+        return result.rowcount
+
+    def _delete_statement(self):
+        """Soft-delete UPDATE if the model has a `deleted_at` field, DELETE otherwise."""
+        if hasattr(self.model, "deleted_at"):
+            return self._update_statement().values(
+                deleted_at=func.now(), is_deleted=True
+            )
+        return delete(self.model)
+
+    async def _invalidate(self, *ids: Any) -> None:
+        if self.cache is not None:
+            await self.cache.invalidate(self.model.__name__, *ids)
+
+    async def _invalidate_all(self) -> None:
+        if self.cache is not None:
+            await self.cache.invalidate_model(self.model.__name__)
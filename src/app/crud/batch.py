@@ -0,0 +1,36 @@
+"""
+Result types for the batch operations of CRUDBase.
+"""
+
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import DBAPIError
+
+T = TypeVar("T")
+
+
+class BatchError(BaseModel):
+    """
+    An item of a batch that could not be processed. `index` refers to the position of the item in the request.
+    """
+
+    index: int
+    id: Any | None = None
+    detail: str
+
+
+class BatchResult(BaseModel, Generic[T]):
+    """
+    Outcome of a batch operation: the processed items and an error for every item that failed.
+    """
+
+    items: list[T] = Field(default_factory=list)
+    errors: list[BatchError] = Field(default_factory=list)
+
+
+def error_detail(error: DBAPIError) -> str:
+    """
+    Returns the message of the database driver for a failed statement, without the SQL and parameters.
+    """
+    return str(error.orig.__cause__ or error.orig)
@@ -0,0 +1,220 @@
+"""
+Read-through cache of serialised entities, keyed by model and id.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+# Written by invalidations in place of an entry, so that reads started before the invalidation cannot store their
+# (possibly stale) entity in the Redis tier afterwards. Encoded entities always contain a newline.
+_TOMBSTONE = b""
+
+# Stores an entry unless the key holds a tombstone (or an entry) or the model has a tombstone
+_SET_SCRIPT = """
+if redis.call('exists', KEYS[1], KEYS[2]) == 0 then
+    return redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[2])
+end
+return false
+"""
+
+
+class CachedEntity(NamedTuple):
+    """
+    A serialised entity, together with the `updated_at` of the row it has been serialised from.
+    """
+
+    data: bytes
+    updated_at: datetime | None = None
+
+    def encode(self) -> bytes:
+        version = self.updated_at.isoformat().encode() if self.updated_at else b""
+        return version + b"\n" + self.data
+
+    @classmethod
+    def decode(cls, value: bytes) -> "CachedEntity":
+        version, _, data = value.partition(b"\n")
+        return cls(data, datetime.fromisoformat(version.decode()) if version else None)
+
+
+class EntityCache:
+    """
+    Two-tier cache of already serialised response bodies.
+
+    The first tier is an in-process LRU bounded by `max_size` entries, each expiring after `ttl` seconds, 0 disables
+    it. Optionally, a shared Redis tier can be connected, so that entries (and invalidations) are shared between
+    processes. The cache is enabled as soon as one of the tiers is.
+
+    Writes only invalidate the in-process tier of the process handling them. After another process (e.g. another
+    gunicorn worker) writes a row, this process keeps serving its entry until it expires, so responses can be up to
+    `ttl` seconds stale. This is why the in-process tier is off by default: with several processes, use the Redis tier
+    only, or a short `ttl` where staleness matters.
+
+    A read that started before a write may finish after the write invalidated its entry. To keep such reads from
+    storing the old row again, readers pass the `version()` taken before reading to `set()`, which skips the entry
+    if the model has been invalidated since. In the Redis tier, invalidations leave tombstones for `ttl` seconds that
+    block entries from being stored.
+
+    Errors of the Redis tier never fail a request, they are counted and the cache falls back to a miss. The
+    statistics of `stats()` are exported by `app.core.metrics.track_entity_cache()`.
+    """
+
+    def __init__(self, max_size: int = 0, ttl: float = 30.0, prefix: str = "entity"):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.prefix = prefix
+        self.redis: Redis | None = None
+        self._set_script: Any = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, CachedEntity]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 or self.redis is not None
+
+    def configure(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._evict()
+
+    async def connect(self, host: str, port: int) -> None:
+        """
+        Connect the shared Redis tier
+        """
+        self.redis = Redis(host=host, port=port)
+        self._set_script = self.redis.register_script(_SET_SCRIPT)
+
+    async def disconnect(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+    async def get(self, model: str, id: Any) -> CachedEntity | None:
+        if not self.enabled:
+            return None
+
+        key = (model, str(id))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, entity = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entity
+            del self._entries[key]
+
+        if self.redis is not None:
+            try:
+                value = await self.redis.get(self._redis_key(*key))
+            except RedisError:
+                self.errors += 1
+                value = None
+            if value is not None and value != _TOMBSTONE:
+                entity = CachedEntity.decode(value)
+                self._store(key, entity)
+                self.hits += 1
+                return entity
+
+        self.misses += 1
+        return None
+
+    def version(self, model: str) -> int:
+        """
+        The number of invalidations of a model in this process, to be taken before reading the entity passed to
+        `set()`
+        """
+        return self._versions.get(model, 0)
+
+    async def set(self, model: str, id: Any, entity: CachedEntity, *, version: int) -> None:
+        """
+        Store an entity read by the primary, unless the model has been invalidated since `version` was taken
+        """
+        if not self.enabled or version != self.version(model):
+            return
+
+        key = (model, str(id))
+        self._store(key, entity)
+        if self.redis is not None:
+            try:
+                await self._set_script(
+                    keys=[self._redis_key(*key), self._redis_model_key(model)],
+                    args=[entity.encode(), self._ttl_ms],
+                )
+            except RedisError:
+                self.errors += 1
+
+    async def invalidate(self, model: str, *ids: Any) -> None:
+        """
+        Drop the entries of the given ids
+        """
+        keys = [(model, str(id)) for id in ids]
+        self._versions[model] = self.version(model) + 1
+        for key in keys:
+            self._entries.pop(key, None)
+        if self.redis is not None and keys:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipeline:
+                    for key in keys:
+                        pipeline.set(self._redis_key(*key), _TOMBSTONE, px=self._ttl_ms)
+                    await pipeline.execute()
+            except RedisError:
+                self.errors += 1
+
+    async def invalidate_model(self, model: str) -> None:
+        """
+        Drop all entries of a model, used after writes that affect an unknown set of rows
+        """
+        self._versions[model] = self.version(model) + 1
+        for key in [key for key in self._entries if key[0] == model]:
+            del self._entries[key]
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_model_key(model), _TOMBSTONE, px=self._ttl_ms)
+                keys = [key async for key in self.redis.scan_iter(match=self._redis_key(model, "*"), count=1000)]
+                if keys:
+                    await self.redis.unlink(*keys)
+            except RedisError:
+                self.errors += 1
+
+    def _store(self, key: tuple[str, str], entity: CachedEntity) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, entity)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > max(self.max_size, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def _ttl_ms(self) -> int:
+        return int(self.ttl * 1000)
+
+    def _redis_key(self, model: str, id: str) -> str:
+        return f"{self.prefix}:{model}:{id}"
+
+    def _redis_model_key(self, model: str) -> str:
+        # Outside of the keys of the entities, so that invalidate_model() does not unlink it
+        return f"{self.prefix}:{model}"
+
+
+entity_cache = EntityCache()
@@ -0,0 +1,71 @@
+"""
+Row count strategies used by CRUDBase.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from enum import StrEnum
+
+from fastapi_filter.contrib.sqlalchemy import Filter
+
+
+class CountStrategy(StrEnum):
+    """
+    How CRUDBase determines row counts:
+
+    * `exact`: Runs a `COUNT(*)` over the filtered query every time.
+    * `cached`: Exact count, re-used per filter fingerprint until the TTL of the count cache expires.
+    * `approximate`: Reads the row estimate from the planner statistics of the table. Only used for unfiltered
+      queries, filtered queries fall back to `cached`.
+    """
+
+    EXACT = "exact"
+    CACHED = "cached"
+    APPROXIMATE = "approximate"
+
+
+class CountCache:
+    """
+    In-process TTL cache of row counts, keyed by filter fingerprint.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    def get(self, key: str) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: int) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def is_filtered(query_filter: Filter | None) -> bool:
+    """
+    Returns whether the filter restricts the result set. Ordering alone does not count as filtering.
+    """
+    return query_filter is not None and any(True for _ in query_filter.filtering_fields)
+
+
+def filter_fingerprint(query_filter: Filter | None) -> str:
+    """
+    Returns a stable key for the rows selected by a filter, ignoring its ordering.
+    """
+    if query_filter is None:
+        return ""
+    return json.dumps(dict(query_filter.filtering_fields), sort_keys=True, default=str)
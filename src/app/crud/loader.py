@@ -0,0 +1,57 @@
+"""
+Request-scoped coalescing of single row reads into batch queries.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+if TYPE_CHECKING:
+    from .base import CRUDBase
+
+
+class EntityLoader:
+    """
+    Collects the ids of all `load()` calls made before the event loop gets to run the pending dispatch, which are
+    the calls made concurrently (e.g. through `asyncio.gather`), and fetches them with one `get_many()` query.
+
+    A loader is bound to a session and thereby to a request. Results are not memoised across dispatches, so a
+    later `load()` sees the current state of the row.
+    """
+
+    def __init__(self, crud: "CRUDBase", db: AsyncSession):
+        self.crud = crud
+        self.db = db
+        self._pending: dict[Any, asyncio.Future] = {}
+        # The event loop only keeps weak references to tasks, so running dispatches are referenced here until done
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, id: Any) -> Any | None:
+        future = self._pending.get(id)
+        if future is None:
+            if not self._pending:
+                # Runs after the callbacks already scheduled, which gives concurrent callers the chance to add ids
+                asyncio.get_running_loop().call_soon(self._schedule_dispatch)
+            future = self._pending[id] = asyncio.get_running_loop().create_future()
+        # Shielded, as callers loading the same id share the future and must not cancel it for each other
+        return await asyncio.shield(future)
+
+    def _schedule_dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._dispatch(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, pending: dict[Any, asyncio.Future]) -> None:
+        try:
+            items = await self.crud.get_many(self.db, list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        found = {item.id: item for item in items}
+        for id, future in pending.items():
+            if not future.done():
+                future.set_result(found.get(id))
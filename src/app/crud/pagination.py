@@ -0,0 +1,133 @@
+"""
+Keyset (cursor) pagination helpers used by CRUDBase.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, Generic, TypeVar
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_filter.contrib.sqlalchemy import Filter
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import ColumnElement
+
+T = TypeVar("T")
+
+
+@lru_cache
+def _type_adapter(python_type: type) -> TypeAdapter:
+    return TypeAdapter(python_type)
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """
+    A page of results in keyset pagination mode. `next_cursor` is `None` on the last page.
+    """
+
+    items: Sequence[T]
+    size: int
+    next_cursor: str | None = None
+
+
+class KeysetColumn:
+    """
+    A single column of a keyset ordering, together with its sort direction.
+    """
+
+    def __init__(self, name: str, column: InstrumentedAttribute, descending: bool = False):
+        self.name = name
+        self.column = column
+        self.descending = descending
+
+    @property
+    def key(self) -> str:
+        return f"-{self.name}" if self.descending else self.name
+
+    def order_by(self) -> ColumnElement:
+        return self.column.desc() if self.descending else self.column.asc()
+
+
+def keyset_ordering(model: Any, query_filter: Filter | None = None) -> list[KeysetColumn]:
+    """
+    Builds the keyset ordering from the `order_by` values of a filter (if any), always terminated by the primary key
+    so that every row has a unique position.
+
+    Raises a `ValueError` for nullable sort columns: NULLs compare neither before nor after a cursor value, so rows
+    with a NULL sort key would silently be skipped.
+    """
+    ordering: list[KeysetColumn] = []
+    try:
+        ordering_values = query_filter.ordering_values if query_filter else None
+    except AttributeError:
+        ordering_values = None
+
+    for field_name in ordering_values or []:
+        name = field_name.replace("-", "").replace("+", "")
+        column = getattr(model, name)
+        if column.expression.nullable:
+            raise ValueError(f"Cannot paginate by cursor when ordering by nullable field {name!r}")
+        ordering.append(KeysetColumn(name, column, field_name.startswith("-")))
+
+    if "id" not in {column.name for column in ordering}:
+        # Follow the direction of the last sort key, which keeps uniform orderings eligible for row comparisons
+        ordering.append(KeysetColumn("id", model.id, ordering[-1].descending if ordering else False))
+    return ordering
+
+
+def keyset_condition(ordering: list[KeysetColumn], values: Sequence[Any]) -> ColumnElement[bool]:
+    """
+    Returns the WHERE clause selecting all rows positioned after `values` in the given ordering.
+
+    If all columns share one direction, this is a single row-value comparison which Postgres can answer with a range
+    scan on a matching composite index. Mixed directions are expanded into the equivalent OR chain.
+    """
+    if len({column.descending for column in ordering}) == 1:
+        columns = tuple_(*(column.column for column in ordering))
+        return columns < tuple_(*values) if ordering[0].descending else columns > tuple_(*values)
+
+    clauses = []
+    for i, column in enumerate(ordering):
+        equal = [previous.column == value for previous, value in zip(ordering[:i], values[:i], strict=True)]
+        after = column.column < values[i] if column.descending else column.column > values[i]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def encode_cursor(ordering: list[KeysetColumn], item: Any) -> str:
+    """
+    Encodes the position of `item` in the given ordering as an opaque, URL safe cursor.
+    """
+    payload = {
+        "o": [column.key for column in ordering],
+        "v": jsonable_encoder([getattr(item, column.name) for column in ordering]),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(ordering: list[KeysetColumn], cursor: str) -> list[Any]:
+    """
+    Decodes a cursor created by `encode_cursor` back into typed column values.
+
+    Raises a `ValueError` if the cursor is malformed or has been created for a different ordering.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        keys, values = payload["o"], payload["v"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if keys != [column.key for column in ordering] or len(values) != len(ordering):
+        raise ValueError("Cursor does not match the requested ordering")
+
+    try:
+        return [
+            _type_adapter(column.column.type.python_type).validate_python(value)
+            for column, value in zip(ordering, values, strict=True)
+        ]
+    except ValidationError as e:
+        raise ValueError("Invalid cursor") from e
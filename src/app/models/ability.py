@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
-from .mixins import SoftDeleteMixin, TimestampMixin, UUIDMixin
+from .mixins import IdStrategy, SoftDeleteMixin, TimestampMixin, UUIDMixin
 
 if TYPE_CHECKING:
     from .hero import Hero
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
 class Ability(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "abilities"
+    id_strategy = IdStrategy.UUID7
 
     name: Mapped[str] = mapped_column(nullable=False)
     strength: Mapped[int] = mapped_column(nullable=False)
@@ -1,10 +1,12 @@
+import uuid
 from typing import TYPE_CHECKING
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
-from .mixins import SoftDeleteMixin, TimestampMixin, UUIDMixin
+from .mixins import IdStrategy, SoftDeleteMixin, TimestampMixin, UUIDMixin, soft_delete_indexes
+from .search import trigram_index
 
 if TYPE_CHECKING:
     from .ability import Ability
@@ -12,7 +14,12 @@ if TYPE_CHECKING:
 
 class Hero(Base, UUIDMixin, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "heroes"
+    id_strategy = IdStrategy.UUID7
+    # Covers the default ordering of HeroFilter, including the id tiebreaker of keyset pagination
+    live_index_columns = (("name", "id"),)
+    # Serves the search of HeroFilter as well as its name__ilike and name__like filters
+    __table_args__ = (*soft_delete_indexes("heroes", live_index_columns), trigram_index("heroes", "name"))
 
     name: Mapped[str] = mapped_column(nullable=False)
-    ability_id: Mapped[int] = mapped_column(ForeignKey("abilities.id"))
-    ability: Mapped["Ability"] = relationship(back_populates="heroes")
+    ability_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("abilities.id"), index=True)
+    ability: Mapped["Ability | None"] = relationship(back_populates="heroes")
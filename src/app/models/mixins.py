@@ -2,21 +2,87 @@
 Database model mixins common to all models.
 """
 
+import os
+import time
 import uuid
+from collections.abc import Sequence
 from datetime import datetime
+from enum import StrEnum
+from typing import ClassVar
 
-from sqlalchemy import TIMESTAMP, text
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DDL, TIMESTAMP, Index, event, func, text
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+
+from .base import Base
+
+# Postgres < 18 has no built-in UUIDv7 function. This takes a random UUIDv4, overwrites its first 48 bits with the
+# unix timestamp in milliseconds and flips the version bits from 4 to 7.
+UUID7_FUNCTION = DDL(
+    """
+    CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+        SELECT encode(
+            set_bit(
+                set_bit(
+                    overlay(
+                        uuid_send(gen_random_uuid())
+                        PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                        FROM 1 FOR 6
+                    ),
+                    52, 1
+                ),
+                53, 1
+            ),
+            'hex'
+        )::uuid
+    $$ LANGUAGE sql VOLATILE
+    """
+)
+event.listen(Base.metadata, "before_create", UUID7_FUNCTION.execute_if(dialect="postgresql"))
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generates a time-ordered UUIDv7 (RFC 9562): 48 bits unix timestamp in milliseconds, followed by 12 bits of
+    sub-millisecond precision and 62 random bits.
+    """
+    nanoseconds = time.time_ns()
+    milliseconds, remainder = divmod(nanoseconds, 1_000_000)
+    sub_milliseconds = remainder * 4096 // 1_000_000
+    random = int.from_bytes(os.urandom(8)) & 0x3FFF_FFFF_FFFF_FFFF
+    value = (milliseconds << 80) | (0x7 << 76) | (sub_milliseconds << 64) | (0b10 << 62) | random
+    return uuid.UUID(int=value)
+
+
+class IdStrategy(StrEnum):
+    """
+    How primary keys of the UUIDMixin are generated:
+
+    * `uuid4`: Random UUIDs.
+    * `uuid7`: Time-ordered UUIDs, so that new rows are appended to the end of the primary key index instead of
+      being scattered across it. Needs the `uuid_generate_v7()` function in the database.
+    """
+
+    UUID4 = "uuid4"
+    UUID7 = "uuid7"
+
+
+ID_DEFAULTS = {
+    IdStrategy.UUID4: (uuid.uuid4, "gen_random_uuid()"),
+    IdStrategy.UUID7: (uuid7, "uuid_generate_v7()"),
+}
 
 
 class UUIDMixin:
     """
-    UUID Mixin
+    UUID Mixin, generating ids according to the `id_strategy` of the model
     """
 
-    id: Mapped[uuid.UUID] = mapped_column(
-        primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()")
-    )
+    id_strategy: ClassVar[IdStrategy] = IdStrategy.UUID4
+
+    @declared_attr
+    def id(cls) -> Mapped[uuid.UUID]:
+        default, server_default = ID_DEFAULTS[cls.id_strategy]
+        return mapped_column(primary_key=True, default=default, server_default=text(server_default))
 
 
 class TimestampMixin:
@@ -26,13 +92,12 @@ class TimestampMixin:
 
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
-        default=datetime.now(),
         server_default=text("current_timestamp(0)"),
     )
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
         nullable=True,
-        onupdate=datetime.now(),
+        onupdate=func.now(),
         server_default=text("current_timestamp(0)"),
     )
 
@@ -40,7 +105,28 @@ class TimestampMixin:
 class SoftDeleteMixin:
     """
     Soft Delete Mixin
+
+    As all regular reads only consider rows with `deleted_at IS NULL`, their indexes are partial indexes restricted
+    to these rows. `live_index_columns` lists the column tuples to index this way, which should cover the filter and
+    sort columns of the model, ending with `id` as the tiebreaker of keyset pagination. Lookups by `id` alone are
+    served by the primary key, so no partial index is created for them by default. Soft-deleted rows get a partial
+    index on `id` of their own, for listing and purging them. Models defining `__table_args__` themselves need to
+    include `soft_delete_indexes()`.
     """
 
+    live_index_columns: ClassVar[Sequence[Sequence[str]]] = ()
+
     deleted_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
     is_deleted: Mapped[bool] = mapped_column(default=False)
+
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        return soft_delete_indexes(cls.__tablename__, cls.live_index_columns)
+
+
+def soft_delete_indexes(table_name: str, live_index_columns: Sequence[Sequence[str]]) -> tuple[Index, ...]:
+    live = [
+        Index(f"ix_{table_name}_{'_'.join(columns)}_live", *columns, postgresql_where=text("deleted_at IS NULL"))
+        for columns in live_index_columns
+    ]
+    return (*live, Index(f"ix_{table_name}_id_deleted", "id", postgresql_where=text("is_deleted IS true")))
@@ -0,0 +1,88 @@
+"""
+Search backends for the `search` field of filters, together with the indexes serving them.
+
+The expressions used in queries and in index definitions are built by the same functions, as Postgres only uses an
+expression index if the query repeats its expression exactly.
+"""
+
+from collections.abc import Sequence
+from enum import StrEnum
+
+from sqlalchemy import DDL, ColumnElement, Index, Table, event, func, literal_column
+from sqlalchemy.sql import column as column_clause
+
+TRIGRAM_EXTENSION = DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+class SearchBackend(StrEnum):
+    """
+    How the `search` field of a filter matches rows:
+
+    * `ilike`: Case-insensitive substring match on every search field. Without an index, this scans the table.
+    * `trigram`: Same matches as `ilike`, but served by `pg_trgm` GIN indexes on the search fields, and ranked by
+      similarity. Needs the `pg_trgm` extension.
+    * `fulltext`: Full text search on a `tsvector` of all search fields, served by a GIN index on that expression,
+      and ranked by `ts_rank`. Matches words rather than substrings, the query supports the `websearch` syntax.
+    """
+
+    ILIKE = "ilike"
+    TRIGRAM = "trigram"
+    FULLTEXT = "fulltext"
+
+
+def _regconfig(language: str) -> ColumnElement:
+    # Rendered inline, as a bound parameter would not match the expression of the index
+    if not language.isidentifier():
+        raise ValueError(f"Invalid text search configuration: {language}")
+    return literal_column(f"'{language}'::regconfig")
+
+
+def search_vector(columns: Sequence[ColumnElement], language: str = "simple") -> ColumnElement:
+    """
+    The `tsvector` of the given columns, which are concatenated separated by spaces.
+    """
+    document = func.coalesce(columns[0], literal_column("''"))
+    for column in columns[1:]:
+        document = document.op("||")(literal_column("' '")).op("||")(func.coalesce(column, literal_column("''")))
+    return func.to_tsvector(_regconfig(language), document)
+
+
+def search_query(value: str, language: str = "simple") -> ColumnElement:
+    return func.websearch_to_tsquery(_regconfig(language), value)
+
+
+def fulltext_index(table_name: str, columns: Sequence[str], language: str = "simple") -> Index:
+    """
+    GIN index on the `tsvector` of the given columns, for use in `__table_args__`
+    """
+    return Index(
+        f"ix_{table_name}_{'_'.join(columns)}_fulltext",
+        search_vector([column_clause(column) for column in columns], language),
+        postgresql_using="gin",
+    )
+
+
+def trigram_index(table_name: str, column: str) -> Index:
+    """
+    GIN trigram index on a single column, for use in `__table_args__`. Also serves `__like` and `__ilike` filters on
+    that column. Creating the table with `create_all()` creates the `pg_trgm` extension first.
+    """
+    index = Index(
+        f"ix_{table_name}_{column}_trigram",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+    event.listen(index, "after_parent_attach", _create_trigram_extension)
+    return index
+
+
+def is_trigram_index(postgresql_ops: dict[str, str] | None) -> bool:
+    """
+    Whether an index with the given `postgresql_ops` needs the `pg_trgm` extension
+    """
+    return any(ops.startswith(("gin_trgm_ops", "gist_trgm_ops")) for ops in (postgresql_ops or {}).values())
+
+
+def _create_trigram_extension(index: Index, table: Table) -> None:
+    event.listen(table, "before_create", TRIGRAM_EXTENSION.execute_if(dialect="postgresql"))
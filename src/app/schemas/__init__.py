@@ -2,6 +2,7 @@
 # This file is auto-generated by generate_inits.py
 from .ability import AbilityCreateSchema, AbilitySchema, AbilityUpdateSchema
 from .hero import HeroCreateSchema, HeroFilter, HeroSchema, HeroUpdateSchema
+from .job import JobSchema
 
 AbilityCreateSchema.model_rebuild()
 AbilitySchema.model_rebuild()
@@ -10,6 +11,7 @@ HeroCreateSchema.model_rebuild()
 HeroSchema.model_rebuild()
 HeroUpdateSchema.model_rebuild()
 HeroFilter.model_rebuild()
+JobSchema.model_rebuild()
 
 
 __all__ = [
@@ -20,4 +22,5 @@ __all__ = [
     "HeroSchema",
     "HeroUpdateSchema",
     "HeroFilter",
+    "JobSchema",
 ]
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 
-from .mixins import SoftDeleteSchema, TimestampSchema, UUIDSchema, partial_model
+from app.models import Ability
+
+from .mixins import SoftDeleteSchema, TimestampSchema, partial_model, uuid_schema
 
 
 class AbilityCreateSchema(BaseModel):
@@ -8,7 +10,7 @@ class AbilityCreateSchema(BaseModel):
     strength: int
 
 
-class AbilitySchema(AbilityCreateSchema, UUIDSchema, TimestampSchema, SoftDeleteSchema):
+class AbilitySchema(AbilityCreateSchema, uuid_schema(Ability), TimestampSchema, SoftDeleteSchema):
     class Config:
         from_attributes = True
 
@@ -1,11 +1,12 @@
 import uuid
 
-from fastapi_filter.contrib.sqlalchemy import Filter
 from pydantic import BaseModel
 
 from app.models import Hero
+from app.models.search import SearchBackend
 
-from .mixins import SoftDeleteSchema, TimestampSchema, UUIDSchema, partial_model
+from .mixins import SoftDeleteSchema, TimestampSchema, partial_model, uuid_schema
+from .search import SearchFilter
 
 
 class HeroCreateSchema(BaseModel):
@@ -13,7 +14,7 @@ class HeroCreateSchema(BaseModel):
     ability_id: uuid.UUID | None = None
 
 
-class HeroSchema(HeroCreateSchema, UUIDSchema, TimestampSchema, SoftDeleteSchema):
+class HeroSchema(HeroCreateSchema, uuid_schema(Hero), TimestampSchema, SoftDeleteSchema):
     class Config:
         from_attributes = True
 
@@ -23,7 +24,7 @@ class HeroUpdateSchema(HeroCreateSchema):
     pass
 
 
-class HeroFilter(Filter):
+class HeroFilter(SearchFilter):
     name: str | None = None
     name__ilike: str | None = None
     name__like: str | None = None
@@ -32,6 +33,7 @@ class HeroFilter(Filter):
     order_by: list[str] = ["name"]
     search: str | None = None
 
-    class Constants(Filter.Constants):
+    class Constants(SearchFilter.Constants):
         model = Hero
         search_model_fields = ["name"]
+        search_backend = SearchBackend.TRIGRAM
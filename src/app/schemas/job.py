@@ -0,0 +1,9 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobSchema(BaseModel):
+    job_id: str
+    status: str
+    progress: dict[str, Any] | None = None
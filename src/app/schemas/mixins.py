@@ -5,47 +5,38 @@ Common mixins for Pydantic models.
 import uuid
 from copy import deepcopy
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 
-from pydantic import BaseModel, Field, create_model, field_serializer
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_serializer
 from pydantic.fields import FieldInfo
 
+from app.models.mixins import ID_DEFAULTS, UUIDMixin
+
 
 # -------------- mixins --------------
 class UUIDSchema:
     id: uuid.UUID = Field(default_factory=uuid.uuid4)
 
 
+@lru_cache
+def uuid_schema(model: type[UUIDMixin]) -> type:
+    """
+    The `UUIDSchema` of `model`, generating ids according to the `id_strategy` of the model
+    """
+    default, _ = ID_DEFAULTS[model.id_strategy]
+    return type(f"{model.__name__}UUIDSchema", (UUIDSchema,), {"id": Field(default_factory=default)})
+
+
 class TimestampSchema:
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC).replace(tzinfo=None))
     updated_at: datetime = Field(default=None)
 
-    @field_serializer("created_at")
-    def serialize_dt(self, created_at: datetime | None, _info: Any) -> str | None:
-        if created_at is not None:
-            return created_at.isoformat()
-
-        return None
-
-    @field_serializer("updated_at")
-    def serialize_updated_at(self, updated_at: datetime | None, _info: Any) -> str | None:
-        if updated_at is not None:
-            return updated_at.isoformat()
-
-        return None
-
 
 class SoftDeleteSchema:
     deleted_at: datetime | None = Field(default=None)
     is_deleted: bool = False
 
-    @field_serializer("deleted_at")
-    def serialize_dates(self, deleted_at: datetime | None, _info: Any) -> str | None:
-        if deleted_at is not None:
-            return deleted_at.isoformat()
-
-        return None
-
 
 def partial_model(model: type[BaseModel]):
     def make_field_optional(field: FieldInfo, default: Any = None) -> tuple[Any, FieldInfo]:
@@ -60,3 +51,32 @@ def partial_model(model: type[BaseModel]):
         __module__=model.__module__,
         **{field_name: make_field_optional(field_info) for field_name, field_info in model.model_fields.items()},
     )
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """
+    Derives a model with only the given subset of fields (and their serializers) from `model`. Cached per field set,
+    so the schema is only built once.
+    """
+    serializers = {}
+    for name, decorator in model.__pydantic_decorators__.field_serializers.items():
+        selected = [field for field in decorator.info.fields if field in fields]
+        if selected:
+            serializers[name] = field_serializer(
+                *selected,
+                mode=decorator.info.mode,
+                return_type=decorator.info.return_type,
+                when_used=decorator.info.when_used,
+            )(decorator.func)
+
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        __module__=model.__module__,
+        __validators__=serializers,
+        **{
+            field_name: (model.model_fields[field_name].annotation, model.model_fields[field_name])
+            for field_name in fields
+        },
+    )
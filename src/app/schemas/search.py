@@ -0,0 +1,75 @@
+"""
+Filter base class using the search backend configured per model.
+"""
+
+from typing import Any
+
+from fastapi_filter.contrib.sqlalchemy import Filter
+from sqlalchemy import ColumnElement, Select, func, or_
+
+from app.models.search import SearchBackend, search_query, search_vector
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchFilter(Filter):
+    """
+    Filter matching its `search` field with the backend set in `Constants.search_backend`:
+
+        class Constants(SearchFilter.Constants):
+            model = Hero
+            search_model_fields = ["name"]
+            search_backend = SearchBackend.FULLTEXT
+            search_language = "simple"
+
+    `search_language` is the text search configuration of the `fulltext` backend, and has to match the one of the
+    index (see `app.models.search`). Unless `search_ranking` is disabled, the `trigram` and `fulltext` backends sort
+    the best matches first, before the regular ordering. Keyset pagination ignores the ranking, as its cursors only
+    encode the ordering columns.
+    """
+
+    class Constants(Filter.Constants):
+        search_backend: SearchBackend = SearchBackend.ILIKE
+        search_language: str = "simple"
+        search_ranking: bool = True
+
+    @property
+    def _search_value(self) -> str | None:
+        if self.Constants.search_backend == SearchBackend.ILIKE or not hasattr(self.Constants, "search_model_fields"):
+            return None
+        return getattr(self, self.Constants.search_field_name, None) or None
+
+    def _search_columns(self) -> list[Any]:
+        return [getattr(self.Constants.model, field) for field in self.Constants.search_model_fields]
+
+    def _search_condition(self, value: str) -> ColumnElement[bool]:
+        columns = self._search_columns()
+        if self.Constants.search_backend == SearchBackend.FULLTEXT:
+            language = self.Constants.search_language
+            return search_vector(columns, language).bool_op("@@")(search_query(value, language))
+        pattern = f"%{_escape_like(value)}%"
+        return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+    def _search_rank(self, value: str) -> ColumnElement[float]:
+        columns = self._search_columns()
+        if self.Constants.search_backend == SearchBackend.FULLTEXT:
+            language = self.Constants.search_language
+            return func.ts_rank(search_vector(columns, language), search_query(value, language))
+        similarities = [func.similarity(column, value) for column in columns]
+        return func.greatest(*similarities) if len(similarities) > 1 else similarities[0]
+
+    def filter(self, query: Select) -> Select:
+        value = self._search_value
+        if value is None:
+            return super().filter(query)
+        # All other fields are handled as usual, the search field is replaced by the backend's condition
+        others = self.model_copy(update={self.Constants.search_field_name: None})
+        return super(SearchFilter, others).filter(query).filter(self._search_condition(value))
+
+    def sort(self, query: Select) -> Select:
+        value = self._search_value
+        if value is not None and self.Constants.search_ranking:
+            query = query.order_by(self._search_rank(value).desc())
+        return super().sort(query)
@@ -0,0 +1,126 @@
+"""
+This script measures the per-request overhead of each middleware of the stack in main.py, by sending requests
+directly through the ASGI interface to a bare endpoint returning a JSON body. Each layer is measured on its own
+around the bare endpoint, and the full stack once, in the order of main.py (outermost first).
+
+Access logs are filtered by the log level (WARNING), so the cost of rendering them is not included.
+
+Run from the src/ directory: python -m helper.benchmark_middleware
+"""
+
+import asyncio
+import json
+import time
+
+from asgi_correlation_id import CorrelationIdMiddleware
+from fastapi_async_sqlalchemy import SQLAlchemyMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import settings, setup_logging
+from app.core.db import RoutingSession
+from app.core.middleware import (
+    CompressionMiddleware,
+    ExceptionHandlerMiddleware,
+    ReadReplicaMiddleware,
+    StructLogMiddleware,
+    XForwardedMiddleware,
+)
+
+REQUESTS = 5000
+BODY = json.dumps([{"id": i, "name": f"Hero {i}"} for i in range(100)]).encode()
+
+LAYERS = [
+    ("CorrelationIdMiddleware", CorrelationIdMiddleware, {}),
+    ("XForwardedMiddleware", XForwardedMiddleware, {}),
+    ("StructLogMiddleware", StructLogMiddleware, {}),
+    ("ExceptionHandlerMiddleware", ExceptionHandlerMiddleware, {}),
+    ("CompressionMiddleware", CompressionMiddleware, {}),
+    ("ReadReplicaMiddleware", ReadReplicaMiddleware, {}),
+    (
+        "SQLAlchemyMiddleware",
+        SQLAlchemyMiddleware,
+        {"db_url": settings.POSTGRES_URI, "session_args": {"sync_session_class": RoutingSession}},
+    ),
+]
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/api/v1/hero",
+    "raw_path": b"/api/v1/hero",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [
+        (b"host", b"localhost"),
+        (b"accept-encoding", b"gzip"),
+        (b"x-forwarded-for", b"203.0.113.7, 10.0.0.1"),
+    ],
+    "client": ("10.0.0.2", 1234),
+    "server": ("localhost", 8000),
+}
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def receiver() -> Receive:
+    """
+    Receive function of one request: the (empty) request body first, then nothing until the request is done
+    """
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive() -> dict:
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    return receive
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def measure(app: ASGIApp) -> float:
+    """
+    Returns the mean duration of a request in microseconds
+    """
+    for _ in range(100):
+        await app(dict(SCOPE), receiver(), send)
+    started = time.perf_counter_ns()
+    for _ in range(REQUESTS):
+        await app(dict(SCOPE), receiver(), send)
+    return (time.perf_counter_ns() - started) / REQUESTS / 1000
+
+
+def stack(layers: list) -> ASGIApp:
+    app = endpoint
+    for _, middleware, kwargs in reversed(layers):
+        app = middleware(app, **kwargs)
+    return app
+
+
+async def main() -> None:
+    baseline = await measure(endpoint)
+    print(f"{REQUESTS} requests, {len(BODY)} bytes response body")
+    print(f"  {'endpoint only':<30} {baseline:8.1f} us")
+    for layer in LAYERS:
+        duration = await measure(stack([layer]))
+        print(f"  {layer[0]:<30} {duration - baseline:+8.1f} us")
+    duration = await measure(stack(LAYERS))
+    print(f"  {'full stack':<30} {duration - baseline:+8.1f} us")
+
+
+setup_logging(json_logs=settings.LOG_JSON_FORMAT, log_level="WARNING")
+asyncio.run(main())
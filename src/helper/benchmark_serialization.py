@@ -0,0 +1,73 @@
+"""
+This script compares the serialisation paths of the generated read endpoints on lists of 1k and 10k rows:
+
+* `fastapi (field serializers)`: Validation against the response model, `jsonable_encoder` and `json.dumps`, as
+  done by FastAPI, with the former per-field datetime serializers of the schema mixins. This is the baseline.
+* `fastapi`: The same, with the native datetime serialisation of Pydantic.
+* `fast`: A single validation and `dump_json` pass of the Pydantic serialiser (`fast_serialization`).
+
+Run from the src/ directory: python -m helper.benchmark_serialization
+"""
+
+import asyncio
+import timeit
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import field_serializer
+
+from app.core.fields import json_response
+from app.models import Hero
+from app.schemas import HeroSchema
+
+ROWS = [1000, 10000]
+REPEAT = 5
+
+
+class FieldSerializerHeroSchema(HeroSchema):
+    @field_serializer("created_at", "updated_at", "deleted_at")
+    def serialize_dt(self, value: datetime | None, _info: Any) -> str | None:
+        return value.isoformat() if value is not None else None
+
+
+def heroes(count: int) -> list[Hero]:
+    now = datetime.now(UTC)
+    return [
+        Hero(id=uuid.uuid4(), name=f"Hero {i}", created_at=now, updated_at=now, deleted_at=None, is_deleted=False)
+        for i in range(count)
+    ]
+
+
+def fastapi_path(schema: type[HeroSchema]):
+    field = create_response_field(name="Response", type_=list[schema])
+
+    def run(items: list[Hero]) -> bytes:
+        content = asyncio.run(serialize_response(field=field, response_content=items, is_coroutine=True))
+        return JSONResponse(content).body
+
+    return run
+
+
+def fast_path(items: list[Hero]) -> bytes:
+    return json_response(list[HeroSchema], items).body
+
+
+paths = {
+    "fastapi (field serializers)": fastapi_path(FieldSerializerHeroSchema),
+    "fastapi": fastapi_path(HeroSchema),
+    "fast": fast_path,
+}
+
+for count in ROWS:
+    items = heroes(count)
+    print(f"{count} rows (best of {REPEAT})")
+    baseline = None
+    for name, path in paths.items():
+        path(items)
+        seconds = min(timeit.repeat(lambda: path(items), number=1, repeat=REPEAT))
+        baseline = baseline or seconds
+        print(f"  {name:<30} {seconds * 1000:8.1f} ms  {baseline / seconds:5.1f}x")
@@ -12,6 +12,9 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Define dirs we want to do this for
 dirs = ["schemas", "models", "crud"]
 
+# Modules providing shared infrastructure rather than exportable classes
+skip_modules = ["base.py", "batch.py", "cache.py", "count.py", "loader.py", "mixins.py", "pagination.py", "search.py"]
+
 for folder in dirs:
     # Within the app/ directory, get all python files and extract class names
     modules = list(Path(os.path.join(parent_dir, "app/" + folder)).rglob("*.py"))
@@ -21,7 +24,7 @@ for folder in dirs:
 
     for module in modules:
         # Skip if __init__.py
-        if "__init__" in module.name or "base.py" in module.name or "mixins.py" in module.name:
+        if "__init__" in module.name or module.name in skip_modules:
             continue
 
         # Load file content
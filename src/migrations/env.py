@@ -6,6 +6,7 @@ import asyncio
 from logging.config import fileConfig
 
 from alembic import context
+from alembic.operations import ops
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
@@ -13,6 +14,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from app import models  # noqa
 from app.core.config import settings
 from app.models.base import Base
+from app.models.search import is_trigram_index
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -37,6 +39,26 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def _creates_trigram_index(operations: list[ops.MigrateOperation]) -> bool:
+    for operation in operations:
+        if isinstance(operation, ops.CreateIndexOp) and is_trigram_index(operation.kw.get("postgresql_ops")):
+            return True
+        if isinstance(operation, ops.OpContainer) and _creates_trigram_index(operation.ops):
+            return True
+    return False
+
+
+def process_revision_directives(migration_context, revision, directives) -> None:
+    """Creates the ``pg_trgm`` extension first in autogenerated revisions creating trigram indexes.
+
+    Autogenerate does not know about extensions, so the revision would fail on a database without it.
+    """
+    for script in directives:
+        for upgrade_ops in script.upgrade_ops_list:
+            if _creates_trigram_index(upgrade_ops.ops):
+                upgrade_ops.ops.insert(0, ops.ExecuteSQLOp("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -49,6 +71,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        process_revision_directives=process_revision_directives,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +81,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        process_revision_directives=process_revision_directives,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,70 @@
+"""
+Helpers for use in migration scripts, covering database objects autogenerate does not know about.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.models.mixins import ID_DEFAULTS, UUID7_FUNCTION, IdStrategy
+from app.models.search import TRIGRAM_EXTENSION, fulltext_index, trigram_index
+
+
+def create_uuid7_function() -> None:
+    """
+    Creates the `uuid_generate_v7()` function, needed by tables using `IdStrategy.UUID7`
+    """
+    op.execute(UUID7_FUNCTION)
+
+
+def drop_uuid7_function() -> None:
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
+
+
+def set_id_strategy(table_name: str, strategy: IdStrategy) -> None:
+    """
+    Switches the server default of the `id` column of an existing table to the given strategy.
+
+    Existing ids are kept, only new rows get ids of the new strategy. When switching to UUIDv7, call
+    `create_uuid7_function()` first.
+    """
+    _, server_default = ID_DEFAULTS[strategy]
+    op.alter_column(table_name, "id", server_default=sa.text(server_default))
+
+
+def create_trigram_extension() -> None:
+    """
+    Creates the `pg_trgm` extension, needed by trigram indexes
+    """
+    op.execute(TRIGRAM_EXTENSION)
+
+
+def create_trigram_index(table_name: str, column: str) -> None:
+    """
+    Creates the GIN trigram index of `trigram_index()` on an existing table. Call `create_trigram_extension()` first.
+    """
+    _create_index(trigram_index(table_name, column), table_name)
+
+
+def create_fulltext_index(table_name: str, columns: list[str], language: str = "simple") -> None:
+    """
+    Creates the GIN index of `fulltext_index()` on an existing table. `columns` and `language` have to match the
+    `search_model_fields` and `search_language` of the filter.
+    """
+    _create_index(fulltext_index(table_name, columns, language), table_name)
+
+
+def _create_index(index: sa.Index, table_name: str) -> None:
+    # Building indexes on large tables takes a while, CONCURRENTLY keeps the table writable meanwhile. This needs to
+    # run outside of a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            index.name,
+            table_name,
+            list(index.expressions),
+            postgresql_concurrently=True,
+            **index.dialect_kwargs,
+        )
+
+
+def drop_search_index(index_name: str, table_name: str) -> None:
+    op.drop_index(index_name, table_name=table_name)
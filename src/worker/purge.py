@@ -0,0 +1,37 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.crud
+from app.core import FastAPIStructLogger
+from app.core.queue import set_job_progress
+from app.crud.base import CRUDBase
+
+from .db import sessionmanager
+
+log = FastAPIStructLogger()
+
+# CRUD objects by the name of their model, as jobs are enqueued with the model name only
+crud_objects: dict[str, CRUDBase] = {
+    crud.model.__name__: crud for crud in (getattr(app.crud, name) for name in app.crud.__all__)
+}
+
+
+async def purge_deleted(
+    ctx: dict[Any, Any] | None, model_name: str, batch_size: int = 10000, pause: float = 0.0
+) -> int:
+    """
+    Purge all soft-deleted rows of a model in batches, reporting the number of purged rows as progress
+    """
+    log.info(f"Purging soft-deleted {model_name} rows", batch_size=batch_size)
+
+    db: AsyncSession = sessionmanager.scoped_session()
+
+    async def progress(purged: int) -> None:
+        await set_job_progress(ctx["redis"], ctx["job_id"], purged=purged, done=False)
+
+    purged = await crud_objects[model_name].purge_all(db, batch_size=batch_size, pause=pause, progress=progress)
+    await set_job_progress(ctx["redis"], ctx["job_id"], purged=purged, done=True)
+
+    log.info(f"Purged {purged} soft-deleted {model_name} rows")
+    return purged
@@ -2,11 +2,14 @@
 ARQ Worker settings
 """
 
+from arq import func
 from arq.connections import RedisSettings
 
 from app.core import settings
+from app.core.queue import job_deserializer
 
 from .hero import print_hero
+from .purge import purge_deleted
 from .setup import on_job_complete, on_job_start, shutdown, startup
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
@@ -18,9 +21,12 @@ class WorkerSettings:
     ARQ Worker settings
     """
 
-    functions = [print_hero]
+    # Purging runs in batches that commit individually, so a timeout never leaves a half purged batch behind
+    functions = [print_hero, func(purge_deleted, timeout=60 * 60)]
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
     on_job_start = on_job_start
     after_job_end = on_job_complete
+    # Takes the correlation id added by `enqueue_job()` out of the job arguments
+    job_deserializer = job_deserializer
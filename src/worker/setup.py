@@ -12,6 +12,9 @@ import uvloop
 from arq.jobs import Job
 
 from app.core import FastAPIStructLogger, settings, setup_logging
+from app.core.logger import OverflowPolicy
+from app.core.queue import job_correlation_id
+from app.core.sampling import is_sampled
 
 from .db import db_session_context, sessionmanager
 
@@ -36,7 +39,13 @@ async def startup(ctx: dict[Any, Any] | None) -> None:
     Worker startup function
     """
     logging.config.dictConfig(log_config())
-    setup_logging(json_logs=settings.LOG_JSON_FORMAT, log_level=settings.LOG_LEVEL)
+    setup_logging(
+        json_logs=settings.LOG_JSON_FORMAT,
+        log_level=settings.LOG_LEVEL,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        overflow=OverflowPolicy(settings.LOG_QUEUE_OVERFLOW),
+        queue_timeout=settings.LOG_QUEUE_TIMEOUT,
+    )
     await sessionmanager.connect()
     log.info("Worker Started")
 
@@ -55,13 +64,14 @@ async def on_job_start(ctx: dict[Any, Any] | None, cid: str | None = None) -> No
     """
     db_session_context.set(ctx["job_id"])
 
-    structlog.contextvars.bind_contextvars(job_id=ctx["job_id"])
+    # Take the correlation id of the request that enqueued the job, or generate one if there is none
+    ctx["cid"] = ctx.get("cid") or job_correlation_id() or uuid4().hex
 
-    # Generate context id if not externally provided (created by FastAPI request)
-    ctx["cid"] = ctx.get("cid", uuid4().hex)
+    structlog.contextvars.bind_contextvars(job_id=ctx["job_id"], request_id=ctx["cid"])
 
     # Create DB session
-    log.info("Job execution started")
+    if is_sampled(ctx["cid"], settings.LOG_JOB_SAMPLE_RATE):
+        log.info("Job execution started")
 
 
 async def on_job_complete(ctx: dict[Any, Any] | None) -> None:
@@ -69,12 +79,15 @@ async def on_job_complete(ctx: dict[Any, Any] | None) -> None:
     Job complete
     """
     job_def = await Job(ctx["job_id"], ctx["redis"]).info()
-    if hasattr(job_def, "success") and job_def.success:
+    success = hasattr(job_def, "success") and job_def.success
+    if success:
         await sessionmanager.scoped_session().commit()
     else:
         await sessionmanager.scoped_session().rollback()
 
     # Close DB session
     await sessionmanager.scoped_session.remove()
-    log.info("Job execution completed")
+    # Failed jobs are always logged
+    if not success or is_sampled(ctx["cid"], settings.LOG_JOB_SAMPLE_RATE):
+        log.info("Job execution completed")
     structlog.contextvars.unbind_contextvars()
@@ -0,0 +1,103 @@
+"""
+Fixtures of the test suite.
+
+The tests run against the Postgres server of the `POSTGRES_*` settings, in the database `TEST_POSTGRES_DB` (default
+`test`), which is created if needed and reset for every test. Lazy loads raise, as in development.
+"""
+
+import os
+
+os.environ["POSTGRES_DB"] = os.environ.get("TEST_POSTGRES_DB", "test")
+os.environ.setdefault("CRUD_RAISE_ON_LAZY_LOAD", "true")
+
+from collections.abc import AsyncGenerator, Generator
+
+import httpx
+import pytest
+from asgi_correlation_id import CorrelationIdMiddleware
+from fastapi import FastAPI
+from fastapi_async_sqlalchemy import SQLAlchemyMiddleware
+from fastapi_pagination import add_pagination
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.api import router
+from app.core import settings
+from app.core.db import RoutingSession
+from app.core.middleware import ExceptionHandlerMiddleware
+from app.crud.cache import EntityCache, entity_cache
+from app.models.base import Base
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database(anyio_backend) -> None:
+    """
+    Creates the test database, if it does not exist yet
+    """
+    url = make_url(settings.POSTGRES_URI)
+    engine = create_async_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as connection:
+            exists = await connection.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": url.database}
+            )
+            if not exists:
+                await connection.execute(text(f'CREATE DATABASE "{url.database}"'))
+    except OSError as e:
+        pytest.skip(f"Postgres is not reachable: {e}")
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def engine(database) -> AsyncGenerator[AsyncEngine, None]:
+    engine = create_async_engine(settings.POSTGRES_URI)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine) -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+def cache() -> Generator[EntityCache, None, None]:
+    """
+    The entity cache of the CRUD objects, with its in-process tier enabled
+    """
+    entity_cache.configure(max_size=1000, ttl=30.0)
+    yield entity_cache
+    entity_cache.configure(max_size=0, ttl=30.0)
+
+
+@pytest.fixture
+def app(engine) -> FastAPI:
+    """
+    The API routers with the middlewares they depend on, without the lifespan of the application (queue, cache and
+    metrics are left unconfigured)
+    """
+    app = FastAPI()
+    app.add_middleware(SQLAlchemyMiddleware, custom_engine=engine, session_args={"sync_session_class": RoutingSession})
+    # noinspection PyTypeChecker
+    app.add_middleware(ExceptionHandlerMiddleware)
+    # noinspection PyTypeChecker
+    app.add_middleware(CorrelationIdMiddleware)
+    app.include_router(router)
+    add_pagination(app)
+    return app
+
+
+@pytest.fixture
+async def client(app) -> AsyncGenerator[httpx.AsyncClient, None]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
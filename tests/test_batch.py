@@ -0,0 +1,121 @@
+"""
+The "/batch" endpoints, which process many rows per statement and report failing items by their position.
+"""
+
+import uuid
+
+import pytest
+
+from app import schemas
+from app.crud import crud_ability, crud_hero
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def heroes(session) -> list:
+    result = await crud_hero.create_many(session, [schemas.HeroCreateSchema(name=f"Hero {i}") for i in range(5)])
+    return result.items
+
+
+async def test_create_reports_failing_items(client, session):
+    ability = await crud_ability.create(session, schemas.AbilityCreateSchema(name="Flight", strength=7))
+    response = await client.post(
+        "/api/v1/hero/batch",
+        json=[
+            {"name": "Superman", "ability_id": str(ability.id)},
+            {"name": "Nobody", "ability_id": str(uuid.uuid4())},
+            {"name": "Batman"},
+        ],
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [item["name"] for item in result["items"]] == ["Superman", "Batman"]
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert "foreign key" in result["errors"][0]["detail"]
+
+
+async def test_read_in_order_of_ids(client, heroes):
+    ids = [str(hero.id) for hero in reversed(heroes)]
+    response = await client.get("/api/v1/hero/batch", params={"ids": ",".join([*ids, str(uuid.uuid4())])})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == ids
+
+
+async def test_read_skips_missing_and_deleted_ids(client, session, heroes):
+    await crud_hero.delete(session, heroes[0].id)
+    ids = [str(heroes[1].id), str(uuid.uuid4()), str(heroes[0].id), str(heroes[1].id)]
+    response = await client.get("/api/v1/hero/batch", params={"ids": ",".join(ids)})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [str(heroes[1].id)]
+
+
+async def test_read_limit(client, heroes):
+    ids = [str(uuid.uuid4()) for _ in range(100)]
+    response = await client.get("/api/v1/hero/batch", params={"ids": ",".join(ids)})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = await client.get("/api/v1/hero/batch", params={"ids": ",".join([*ids, str(heroes[0].id)])})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "At most 100 ids can be read at once"
+
+    response = await client.get("/api/v1/hero/batch", params={"ids": "not-an-id"})
+    assert response.status_code == 400
+
+
+async def test_update(client, session, heroes):
+    await crud_hero.delete(session, heroes[1].id)
+    missing = uuid.uuid4()
+    response = await client.patch(
+        "/api/v1/hero/batch",
+        json=[
+            {"id": str(heroes[0].id), "name": "Renamed"},
+            {"id": str(heroes[1].id), "name": "Deleted"},
+            {"id": str(missing), "name": "Missing"},
+            {"id": str(heroes[2].id)},
+            {"id": str(heroes[3].id), "ability_id": str(uuid.uuid4())},
+            {"id": str(heroes[4].id), "name": "First"},
+            {"id": str(heroes[4].id), "name": "Second"},
+        ],
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["items"] == [str(heroes[i].id) for i in (0, 2, 4, 4)]
+    assert [(error["index"], error["id"]) for error in result["errors"]] == [
+        (1, str(heroes[1].id)),
+        (2, str(missing)),
+        (4, str(heroes[3].id)),
+    ]
+    assert result["errors"][0]["detail"] == "Model does not exist"
+    assert "foreign key" in result["errors"][2]["detail"]
+
+    session.expire_all()
+    names = {hero.id: hero.name for hero in await crud_hero.get_all(session)}
+    assert names == {
+        heroes[0].id: "Renamed",
+        heroes[2].id: "Hero 2",
+        heroes[3].id: "Hero 3",
+        heroes[4].id: "Second",
+    }
+
+
+async def test_update_does_not_resurrect_deleted_rows(client, session, heroes):
+    await crud_hero.delete(session, heroes[0].id)
+    response = await client.patch("/api/v1/hero/batch", json=[{"id": str(heroes[0].id), "name": "Zombie"}])
+    assert response.json()["items"] == []
+    deleted = await crud_hero.get_deleted(session, heroes[0].id)
+    await session.refresh(deleted)
+    assert deleted.name == "Hero 0"
+
+
+async def test_delete(client, session, heroes):
+    missing = uuid.uuid4()
+    response = await client.request(
+        "DELETE", "/api/v1/hero/batch", json=[str(heroes[0].id), str(missing), str(heroes[0].id)]
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["items"] == [str(heroes[0].id)] * 2
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert len(await crud_hero.get_all(session)) == 4
@@ -0,0 +1,159 @@
+"""
+Compression of response bodies, negotiated via Accept-Encoding.
+"""
+
+import gzip
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+
+from app.core.middleware import CompressionMiddleware
+from app.core.middleware.compression import Encoder, parse_accept_encoding
+
+pytestmark = pytest.mark.anyio
+
+BODY = b'{"name": "Superman"}' * 100
+
+
+@pytest.fixture
+def app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/json")
+    def json() -> Response:
+        return Response(BODY, media_type="application/json", headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small() -> Response:
+        return Response(b"{}", media_type="application/json")
+
+    @app.get("/image")
+    def image() -> Response:
+        return Response(BODY, media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded() -> Response:
+        return Response(gzip.compress(BODY), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    def events() -> StreamingResponse:
+        return StreamingResponse(iter([b"data: 1\n\n", b"data: 2\n\n"]), media_type="text/event-stream")
+
+    @app.get("/text")
+    def text() -> PlainTextResponse:
+        return PlainTextResponse("x" * 2000)
+
+    # noinspection PyTypeChecker
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return app
+
+
+async def get(app: FastAPI, path: str, accept_encoding: str = "gzip") -> tuple[httpx.Headers, bytes]:
+    """
+    The headers and the raw body of a response, without the decoding done by httpx
+    """
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            return response.headers, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+def test_encoder_is_abstract():
+    with pytest.raises(TypeError):
+        Encoder()
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip;q=0.5, BR, *;q=0, zstd;q=x, ") == {"gzip": 0.5, "br": 1.0, "*": 0.0, "zstd": 0.0}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, coding",
+    [
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1, br;q=0.8, zstd;q=0.5", "gzip"),
+        ("br;q=0.9, zstd;q=0.9", "zstd"),
+        ("*", "zstd"),
+        ("*;q=0.5, zstd;q=0", "br"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, coding):
+    middleware = CompressionMiddleware(None)
+    middleware.encoders = {"zstd": None, "br": None, "gzip": None}
+    assert middleware.negotiate(accept_encoding) == coding
+
+
+async def test_compresses_complete_bodies(app):
+    headers, body = await get(app, "/json")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body) < len(BODY)
+    assert gzip.decompress(body) == BODY
+    # The representation differs from the uncompressed one
+    assert headers["etag"] == 'W/"abc"'
+
+
+async def test_text_responses_are_compressed(app):
+    headers, body = await get(app, "/text")
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body) == b"x" * 2000
+
+
+async def test_small_bodies_are_sent_as_is(app):
+    headers, body = await get(app, "/small")
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["content-length"] == "2"
+    assert body == b"{}"
+
+
+async def test_without_accept_encoding(app):
+    headers, body = await get(app, "/json", accept_encoding="")
+    assert "content-encoding" not in headers
+    assert body == BODY
+
+
+@pytest.mark.parametrize("path", ["/image", "/encoded", "/events"])
+async def test_uncompressible_responses_are_passed_through(app, path):
+    uncompressed_headers, uncompressed = await get(app, path, accept_encoding="identity")
+    headers, body = await get(app, path)
+    assert headers.get("content-encoding") == uncompressed_headers.get("content-encoding")
+    assert "vary" not in headers
+    assert body == uncompressed
+
+
+async def test_streamed_bodies_are_compressed_chunk_by_chunk(app):
+    headers, body = await get(app, "/stream")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in headers
+    assert gzip.decompress(body) == BODY * 2
+
+
+async def test_streamed_chunks_are_decodable_on_arrival():
+    chunks = []
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message["body"])
+
+    async def stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": BODY, "more_body": True})
+        await send({"type": "http.response.body", "body": BODY, "more_body": False})
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompressionMiddleware(stream)(scope, None, send)
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    assert decompressor.decompress(chunks[0]) == BODY
+    assert decompressor.decompress(chunks[1]) == BODY
+    assert scope["state"]["compression"]["original_size"] == 2 * len(BODY)
@@ -0,0 +1,86 @@
+"""
+ETag and Last-Modified validators of the CRUD read endpoints, and 304 responses to matching preconditions.
+"""
+
+import pytest
+
+from app import schemas
+from app.crud import crud_ability, crud_hero
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def hero(session):
+    return await crud_hero.create(session, schemas.HeroCreateSchema(name="Superman"))
+
+
+@pytest.mark.parametrize("cached", [True, False])
+async def test_read_item(request, client, hero, cached):
+    url = f"/api/v1/hero/{hero.id}"
+    if cached:
+        # Served from the entity cache on the second request
+        request.getfixturevalue("cache")
+        await client.get(url)
+    response = await client.get(url)
+    assert response.status_code == 200
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    assert etag.startswith('W/"')
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = await client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = await client.get(url, headers={"If-None-Match": 'W/"other"'})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Superman"
+
+
+async def test_update_changes_etag(client, hero):
+    url = f"/api/v1/hero/{hero.id}"
+    etag = (await client.get(url)).headers["etag"]
+    await client.patch(url, json={"name": "Clark Kent"})
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Clark Kent"
+    assert response.headers["etag"] != etag
+
+
+async def test_sparse_fieldsets_have_own_etags(client, hero):
+    url = f"/api/v1/hero/{hero.id}"
+    etag = (await client.get(url)).headers["etag"]
+
+    response = await client.get(url, params={"fields": "name"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == {"name": "Superman"}
+    sparse_etag = response.headers["etag"]
+    assert sparse_etag != etag
+
+    response = await client.get(url, params={"fields": "name"}, headers={"If-None-Match": sparse_etag})
+    assert response.status_code == 304
+
+
+async def test_cursor_page(client, session, hero):
+    etag = (await client.get("/api/v1/hero")).headers["etag"]
+    assert (await client.get("/api/v1/hero", headers={"If-None-Match": etag})).status_code == 304
+
+    await crud_hero.create(session, schemas.HeroCreateSchema(name="Batman"))
+    response = await client.get("/api/v1/hero", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+
+
+async def test_offset_page(client, session):
+    await crud_ability.create(session, schemas.AbilityCreateSchema(name="Flight", strength=7))
+    response = await client.get("/api/v1/ability")
+    assert "last-modified" not in response.headers
+    etag = response.headers["etag"]
+    assert (await client.get("/api/v1/ability", headers={"If-None-Match": etag})).status_code == 304
+    # Other pages have ETags of their own
+    response = await client.get("/api/v1/ability", params={"size": 1, "page": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
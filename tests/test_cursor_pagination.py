@@ -0,0 +1,78 @@
+"""
+Keyset (cursor) pagination of the hero endpoint, which orders by the `order_by` values of the filter plus the id.
+"""
+
+import pytest
+
+from app import schemas
+from app.crud import crud_hero
+
+pytestmark = pytest.mark.anyio
+
+NAMES = ["Batman", "Aquaman", "Batman", "Cyborg", "Aquaman", "Flash", "Batman"]
+
+
+@pytest.fixture
+async def heroes(session) -> list:
+    result = await crud_hero.create_many(session, [schemas.HeroCreateSchema(name=name) for name in NAMES])
+    return result.items
+
+
+async def read_all_pages(client, **params) -> tuple[list[dict], int]:
+    items, pages, cursor = [], 0, None
+    while True:
+        response = await client.get("/api/v1/hero", params={**params, "cursor": cursor} if cursor else params)
+        assert response.status_code == 200
+        page = response.json()
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+async def test_pages_cover_all_rows_in_order(client, heroes):
+    items, pages = await read_all_pages(client, size=2)
+    assert pages == 4
+    assert [(item["name"], item["id"]) for item in items] == sorted((hero.name, str(hero.id)) for hero in heroes)
+
+
+async def test_descending_order(client, heroes):
+    items, _ = await read_all_pages(client, size=3, order_by="-name")
+    assert [(item["name"], item["id"]) for item in items] == sorted(
+        ((hero.name, str(hero.id)) for hero in heroes), reverse=True
+    )
+
+
+async def test_mixed_directions(client, heroes):
+    items, _ = await read_all_pages(client, size=2, order_by="-name,id")
+    expected = sorted(heroes, key=lambda hero: str(hero.id))
+    expected = sorted(expected, key=lambda hero: hero.name, reverse=True)
+    assert [item["id"] for item in items] == [str(hero.id) for hero in expected]
+
+
+async def test_filter_applies_to_all_pages(client, heroes):
+    items, _ = await read_all_pages(client, size=2, name="Batman")
+    assert [item["name"] for item in items] == ["Batman"] * 3
+
+
+async def test_rows_created_behind_the_cursor_are_not_repeated(client, session, heroes):
+    response = await client.get("/api/v1/hero", params={"size": 3})
+    first_page = response.json()
+    await crud_hero.create(session, schemas.HeroCreateSchema(name="Aaron"))
+    items, _ = await read_all_pages(client, size=3, cursor=first_page["next_cursor"])
+    assert "Aaron" not in [item["name"] for item in items]
+    assert len(first_page["items"]) + len(items) == len(NAMES)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJmb28iOiAiYmFyIn0"])
+async def test_invalid_cursor(client, heroes, cursor):
+    response = await client.get("/api/v1/hero", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+async def test_nullable_sort_column_is_rejected(client, heroes):
+    # Heroes without an ability would never be positioned after a cursor, and silently be skipped
+    response = await client.get("/api/v1/hero", params={"order_by": "ability_id"})
+    assert response.status_code == 400
+    assert "ability_id" in response.json()["detail"]
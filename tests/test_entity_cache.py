@@ -0,0 +1,55 @@
+"""
+Entity cache of the CRUD read endpoint: opt-in, and never storing rows that may be stale.
+"""
+
+import pytest
+
+from app import schemas
+from app.core import crud_endpoints
+from app.crud import crud_hero
+from app.crud.cache import CachedEntity, EntityCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def hero(session):
+    return await crud_hero.create(session, schemas.HeroCreateSchema(name="Superman"))
+
+
+def test_disabled_by_default():
+    assert not EntityCache().enabled
+
+
+async def test_set_after_invalidation_is_skipped():
+    cache = EntityCache(max_size=10)
+    # A read starts, a write invalidates the entity, then the read finishes
+    version = cache.version("Hero")
+    await cache.invalidate("Hero", 1)
+    await cache.set("Hero", 1, CachedEntity(b"old"), version=version)
+    assert await cache.get("Hero", 1) is None
+
+    version = cache.version("Hero")
+    await cache.invalidate_model("Hero")
+    await cache.set("Hero", 1, CachedEntity(b"old"), version=version)
+    assert await cache.get("Hero", 1) is None
+
+    # Reads of other models are not affected
+    await cache.set("Ability", 1, CachedEntity(b"new"), version=cache.version("Ability"))
+    assert (await cache.get("Ability", 1)).data == b"new"
+
+
+async def test_read_item_is_cached(client, cache, hero):
+    response = await client.get(f"/api/v1/hero/{hero.id}")
+    assert (await cache.get("Hero", hero.id)).data == response.content
+
+    await client.patch(f"/api/v1/hero/{hero.id}", json={"name": "Clark Kent"})
+    assert await cache.get("Hero", hero.id) is None
+    assert (await client.get(f"/api/v1/hero/{hero.id}")).json()["name"] == "Clark Kent"
+
+
+async def test_replica_reads_are_not_cached(client, cache, hero, monkeypatch):
+    monkeypatch.setattr(crud_endpoints, "served_by_replica", lambda session: True)
+    response = await client.get(f"/api/v1/hero/{hero.id}")
+    assert response.json()["name"] == "Superman"
+    assert await cache.get("Hero", hero.id) is None
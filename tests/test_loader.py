@@ -0,0 +1,80 @@
+"""
+Reads of many rows by id with one query, and the coalescing of concurrent single row reads into such queries.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app import schemas
+from app.crud import crud_hero
+from app.crud.loader import EntityLoader
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def heroes(session) -> list:
+    result = await crud_hero.create_many(session, [schemas.HeroCreateSchema(name=f"Hero {i}") for i in range(4)])
+    await crud_hero.delete(session, result.items[3].id)
+    return result.items
+
+
+@pytest.fixture
+def queries(engine) -> list[str]:
+    """
+    The SELECT statements sent to the database while the test runs
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def test_get_many(session, heroes):
+    missing = uuid.uuid4()
+    ids = [heroes[2].id, missing, heroes[0].id, heroes[3].id, heroes[2].id]
+    items = await crud_hero.get_many(session, ids)
+    # In the order of the ids, without missing and soft deleted rows, and duplicates only once
+    assert [item.id for item in items] == [heroes[2].id, heroes[0].id]
+    assert await crud_hero.get_many(session, []) == []
+
+
+async def test_get_many_columns(session, heroes):
+    items = await crud_hero.get_many(session, [heroes[1].id], columns=["id", "name"])
+    assert [(item.id, item.name) for item in items] == [(heroes[1].id, "Hero 1")]
+
+
+async def test_concurrent_loads_are_coalesced(session, heroes, queries):
+    missing = uuid.uuid4()
+    ids = [heroes[1].id, heroes[0].id, missing, heroes[3].id, heroes[1].id]
+    items = await asyncio.gather(*(crud_hero.load(session, id) for id in ids))
+    assert [item and item.id for item in items] == [heroes[1].id, heroes[0].id, None, None, heroes[1].id]
+    assert len(queries) == 1
+
+
+async def test_sequential_loads_are_not_memoised(session, heroes, queries):
+    assert (await crud_hero.load(session, heroes[0].id)).name == "Hero 0"
+    await crud_hero.delete(session, heroes[0].id)
+    assert await crud_hero.load(session, heroes[0].id) is None
+    assert len(queries) == 2
+
+
+async def test_loader_errors_reach_all_callers(session, heroes):
+    class FailingCrud:
+        async def get_many(self, db, ids):
+            raise RuntimeError("connection lost")
+
+    loader = EntityLoader(FailingCrud(), session)
+    results = await asyncio.gather(loader.load(heroes[0].id), loader.load(heroes[1].id), return_exceptions=True)
+    assert [str(result) for result in results] == ["connection lost", "connection lost"]
+    # The dispatch task is referenced until it is done
+    await asyncio.sleep(0)
+    assert not loader._tasks
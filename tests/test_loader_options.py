@@ -0,0 +1,46 @@
+"""
+Relationships are only loaded through the loader options of a read. Any other (lazy) load raises, instead of silently
+emitting a query per row.
+"""
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload
+
+from app import models, schemas
+from app.crud import crud_ability, crud_hero
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def hero(engine, session) -> models.Hero:
+    ability = await crud_ability.create(session, schemas.AbilityCreateSchema(name="Flight", strength=7))
+    return await crud_hero.create(session, schemas.HeroCreateSchema(name="Superman", ability_id=ability.id))
+
+
+async def test_lazy_load_raises(engine, session, hero):
+    session.expunge_all()
+    loaded = await crud_hero.get(session, hero.id)
+    # Within run_sync, a lazy load could emit its query, so only the raiseload option prevents it
+    with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+        await session.run_sync(lambda _: loaded.ability)
+
+
+async def test_loader_options_avoid_lazy_load(engine, session, hero):
+    session.expunge_all()
+    loaded = await crud_hero.get(session, hero.id, options=[selectinload(models.Hero.ability)])
+    assert await session.run_sync(lambda _: loaded.ability.name) == "Flight"
+
+
+async def test_get_hero_ability(client, hero, monkeypatch):
+    jobs = []
+
+    async def enqueue_job(job_name, *args, **kwargs):
+        jobs.append((job_name, *args))
+
+    monkeypatch.setattr("app.api.v1.hero.enqueue_job", enqueue_job)
+    response = await client.get(f"/api/v1/hero/{hero.id}/ability")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Flight"
+    assert jobs == [("print_hero", hero.id)] * 2
@@ -0,0 +1,113 @@
+"""
+The queued log handler, which renders and writes records in a background thread.
+"""
+
+import io
+import logging
+import threading
+import time
+
+import pytest
+
+from app.core.logger import OverflowPolicy, QueuedLogHandler
+from app.core.metrics import registry, track_log_handlers
+
+
+class StalledStream(io.StringIO):
+    """
+    Output blocking all writes until released
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def write(self, s: str) -> int:
+        self.writing.set()
+        self.released.wait()
+        return super().write(s)
+
+
+@pytest.fixture
+def stream():
+    stream = StalledStream()
+    yield stream
+    stream.released.set()
+
+
+def record(level: int) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 0, "message", None, None)
+
+
+def fill(handler: QueuedLogHandler, stream: StalledStream) -> None:
+    # The first record stalls the writer thread, the others fill the queue
+    handler.handle(record(logging.ERROR))
+    assert stream.writing.wait(1)
+    for _ in range(handler.max_size):
+        handler.handle(record(logging.ERROR))
+    assert handler.dropped == {}
+
+
+@pytest.mark.parametrize("overflow", list(OverflowPolicy))
+def test_full_queue_drops_after_timeout(stream, overflow):
+    handler = QueuedLogHandler(stream, max_size=2, overflow=overflow, put_timeout=0.05)
+    fill(handler, stream)
+
+    started = time.monotonic()
+    handler.handle(record(logging.ERROR))
+    assert 0.05 <= time.monotonic() - started < 1
+    assert handler.dropped == {"ERROR": 1}
+
+    stream.released.set()
+    handler.close()
+    assert stream.getvalue().count("message") == 3
+
+
+def test_low_levels_are_dropped_without_waiting(stream):
+    handler = QueuedLogHandler(stream, max_size=2, put_timeout=10)
+    fill(handler, stream)
+
+    started = time.monotonic()
+    handler.handle(record(logging.DEBUG))
+    handler.handle(record(logging.INFO))
+    assert time.monotonic() - started < 1
+    assert handler.dropped == {"DEBUG": 1, "INFO": 1}
+    stream.released.set()
+    handler.close()
+
+
+def test_drops_from_several_threads_are_all_counted(stream):
+    handler = QueuedLogHandler(stream, max_size=2, put_timeout=10)
+    fill(handler, stream)
+
+    def drop() -> None:
+        for _ in range(1000):
+            handler.handle(record(logging.DEBUG))
+
+    threads = [threading.Thread(target=drop) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert handler.dropped == {"DEBUG": 8000}
+    stream.released.set()
+    handler.close()
+
+
+def test_dropped_records_are_exported(stream):
+    handler = QueuedLogHandler(stream, max_size=2, put_timeout=0)
+    fill(handler, stream)
+    handler.handle(record(logging.WARNING))
+    handler.handle(record(logging.INFO))
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    try:
+        track_log_handlers()
+        for level in ("WARNING", "INFO"):
+            assert registry.get_sample_value("log_records_dropped_total", {"level": level}) == 1
+    finally:
+        root_logger.removeHandler(handler)
+        stream.released.set()
+        handler.close()
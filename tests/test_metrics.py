@@ -0,0 +1,115 @@
+"""
+Metrics collected from the statistics of other components, and the aggregation of the metrics of several processes.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from fastapi import Response
+
+from app.core.metrics import registry, track_entity_cache, track_single_flights
+from app.core.singleflight import SingleFlight
+from app.crud.cache import CachedEntity, EntityCache
+
+pytestmark = pytest.mark.anyio
+
+
+def value(name: str, **labels: str) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+async def test_entity_cache():
+    cache = EntityCache(max_size=1)
+    track_entity_cache(cache)
+    before = {result: value("entity_cache_requests_total", result=result) for result in ("hit", "miss")}
+    evictions = value("entity_cache_evictions_total")
+    await cache.set("Hero", 1, CachedEntity(b"{}"), version=0)
+    await cache.set("Hero", 2, CachedEntity(b"{}"), version=0)
+    await cache.get("Hero", 1)
+    await cache.get("Hero", 2)
+
+    assert value("entity_cache_requests_total", result="hit") == before["hit"] + 1
+    assert value("entity_cache_requests_total", result="miss") == before["miss"] + 1
+    assert value("entity_cache_evictions_total") == evictions + 1
+    assert value("entity_cache_entries") == 1
+
+
+async def test_tracking_is_idempotent():
+    cache = EntityCache(max_size=1)
+    track_entity_cache(cache)
+    track_entity_cache(cache)
+    before = value("entity_cache_requests_total", result="miss")
+    await cache.get("Hero", 1)
+    # Every read runs the collectors, which must not count the same miss again
+    assert value("entity_cache_requests_total", result="miss") == before + 1
+    assert value("entity_cache_requests_total", result="miss") == before + 1
+    assert list(registry.collectors).count("entity_cache") == 1
+
+
+async def test_single_flights():
+    single_flight = SingleFlight()
+    track_single_flights()
+    before = value("single_flight_requests_total", outcome="shared")
+    release = asyncio.Event()
+
+    async def handler() -> Response:
+        await release.wait()
+        return Response(b"ok")
+
+    tasks = [asyncio.create_task(single_flight.run("key", handler)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert value("single_flight_in_flight") == 1
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert value("single_flight_requests_total", outcome="shared") == before + 2
+    assert value("single_flight_in_flight") == 0
+
+
+async def test_render():
+    text = (await registry.render()).decode()
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert "# TYPE entity_cache_requests_total counter" in text
+
+
+def run(code: str, directory) -> str:
+    """
+    Runs code in a process of its own, as prometheus_client picks its multiprocess mode on import
+    """
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directory), "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", textwrap.dedent(code)], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_aggregates_processes(tmp_path):
+    worker = """
+        import os
+        from app.core.metrics import http_requests_in_flight, queue_jobs_enqueued
+
+        queue_jobs_enqueued.labels(job="aggregated", outcome="enqueued").inc()
+        http_requests_in_flight.labels(method="GET").inc()
+        print(os.getpid())
+    """
+    exited = int(run(worker, tmp_path))
+    run(worker, tmp_path)
+    run(f"from app.core.metrics import mark_process_dead; mark_process_dead({exited})", tmp_path)
+
+    text = run(
+        """
+        import asyncio
+        from app.core.metrics import registry
+
+        print(asyncio.run(registry.render()).decode())
+        """,
+        tmp_path,
+    )
+    # Counters of exited processes are kept, their gauges dropped
+    assert 'queue_jobs_enqueued_total{job="aggregated",outcome="enqueued"} 2.0' in text
+    assert 'http_requests_in_flight{method="GET"} 1.0' in text
@@ -0,0 +1,123 @@
+"""
+Sampling of access log records and job logs, keyed on the correlation id shared by a request and its jobs.
+"""
+
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+from arq.jobs import deserialize_job_raw, serialize_job
+from asgi_correlation_id import CorrelationIdMiddleware, correlation_id
+from fastapi import FastAPI
+
+from app.core import queue
+from app.core.metrics import registry
+from app.core.middleware import StructLogMiddleware
+from app.core.queue import CORRELATION_ID_KWARG, enqueue_job, job_deserializer
+from app.core.sampling import AccessLogSampler, is_sampled, parse_rates
+
+pytestmark = pytest.mark.anyio
+
+
+def test_sampling_is_deterministic_and_monotonic():
+    keys = [uuid4().hex for _ in range(2000)]
+    sampled = {rate: {key for key in keys if is_sampled(key, rate)} for rate in (0.01, 0.1, 0.5)}
+    assert sampled[0.01] <= sampled[0.1] <= sampled[0.5]
+    assert 100 < len(sampled[0.1]) < 300
+    assert sampled[0.1] == {key for key in keys if is_sampled(key, 0.1)}
+    assert all(is_sampled(key, 1) and not is_sampled(key, 0) for key in keys[:10])
+
+
+def test_parse_rates():
+    assert parse_rates("2xx=0.01, 4xx=1,") == {"2xx": 0.01, "4xx": 1.0}
+    assert parse_rates("/api/v1/hero/{id}=0.1") == {"/api/v1/hero/{id}": 0.1}
+    assert parse_rates("") == {}
+
+
+def test_access_log_sampler():
+    sampler = AccessLogSampler({"2xx": 0.01, "5xx": 1}, {"/health": 0}, slow_threshold=1.0)
+    assert sampler.rate("/api/v1/hero", 200, 0.1) == 0.01
+    assert sampler.rate("/health", 200, 0.1) == 0
+    # Failing requests of a route use the rate of their status class
+    assert sampler.rate("/health", 500, 0.1) == 1
+    assert sampler.rate("/api/v1/hero", 404, 0.1) == 1
+    assert sampler.rate("/health", 200, 1.5) == 1
+
+
+def access_log_records(outcome: str) -> float:
+    return registry.get_sample_value("access_log_records_total", {"outcome": outcome}) or 0.0
+
+
+@pytest.mark.parametrize("rate, outcome", [(0, "sampled_out"), (1, "logged")])
+async def test_access_log_records(rate, outcome):
+    app = FastAPI()
+    app.get("/ok")(lambda: {})
+    # noinspection PyTypeChecker
+    app.add_middleware(StructLogMiddleware, sampler=AccessLogSampler({"2xx": rate}))
+    # noinspection PyTypeChecker
+    app.add_middleware(CorrelationIdMiddleware)
+
+    before = access_log_records(outcome)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(3):
+            assert (await client.get("/ok")).status_code == 200
+    assert access_log_records(outcome) == before + 3
+
+
+class FakePool:
+    """
+    Stands in for the Redis pool, keeping the serialised jobs
+    """
+
+    def __init__(self):
+        self.jobs: list[bytes] = []
+
+    async def enqueue_job(self, function: str, *args, **kwargs):
+        self.jobs.append(serialize_job(function, args, kwargs, None, 0))
+        return object()
+
+
+async def run_on_job_start(data: bytes) -> tuple[str, dict]:
+    """
+    Deserializes a job and runs `on_job_start` in a task of its own, as the arq worker does
+    """
+    from worker.setup import on_job_start
+
+    async def run() -> tuple[str, dict]:
+        _, _, kwargs, _, _ = deserialize_job_raw(data, deserializer=job_deserializer)
+        ctx = {"job_id": uuid4().hex}
+        await on_job_start(ctx)
+        return ctx["cid"], kwargs
+
+    return await asyncio.create_task(run())
+
+
+async def test_job_takes_correlation_id_of_request(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(queue, "pool", pool)
+    token = correlation_id.set("a" * 32)
+    try:
+        await enqueue_job("print_hero", 1)
+    finally:
+        correlation_id.reset(token)
+
+    cid, kwargs = await run_on_job_start(pool.jobs[0])
+    assert cid == "a" * 32
+    assert CORRELATION_ID_KWARG not in kwargs
+
+
+async def test_job_outside_of_request_gets_new_correlation_id(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(queue, "pool", pool)
+    # Requests of other tests may have left their correlation id in the context of the test runner
+    token = correlation_id.set(None)
+    try:
+        await enqueue_job("print_hero", 1)
+        await enqueue_job("print_hero", 2)
+    finally:
+        correlation_id.reset(token)
+
+    (first, kwargs), (second, _) = [await run_on_job_start(data) for data in pool.jobs]
+    assert kwargs == {}
+    assert len(first) == 32 and first != second
@@ -0,0 +1,21 @@
+"""
+Defaults of the API schemas, following the configuration of their models.
+"""
+
+from app.models.mixins import IdStrategy, UUIDMixin
+from app.schemas.mixins import UUIDSchema, uuid_schema
+
+
+class RandomIds(UUIDMixin):
+    id_strategy = IdStrategy.UUID4
+
+
+class TimeOrderedIds(UUIDMixin):
+    id_strategy = IdStrategy.UUID7
+
+
+def test_uuid_schema_follows_id_strategy():
+    assert uuid_schema(RandomIds).id.default_factory().version == 4
+    assert uuid_schema(TimeOrderedIds).id.default_factory().version == 7
+    assert issubclass(uuid_schema(TimeOrderedIds), UUIDSchema)
+    assert uuid_schema(TimeOrderedIds) is uuid_schema(TimeOrderedIds)
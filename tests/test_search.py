@@ -0,0 +1,54 @@
+"""
+Search of the hero endpoints with the trigram backend: substring matches, served by the trigram index.
+"""
+
+import pytest
+from sqlalchemy import create_mock_engine, text
+
+from app import schemas
+from app.crud import crud_hero
+from app.models.base import Base
+
+pytestmark = pytest.mark.anyio
+
+NAMES = ["Superman", "Batman", "Flash", "Supergirl"]
+
+
+@pytest.fixture
+async def heroes(session) -> list:
+    result = await crud_hero.create_many(session, [schemas.HeroCreateSchema(name=name) for name in NAMES])
+    return result.items
+
+
+@pytest.mark.parametrize(
+    "search, expected",
+    [("uper", ["Supergirl", "Superman"]), ("MAN", ["Batman", "Superman"]), ("50%", [])],
+)
+async def test_search_matches_substrings(client, heroes, search, expected):
+    response = await client.get("/api/v1/hero", params={"search": search})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["items"]] == expected
+
+
+async def test_search_ranks_by_similarity(client, heroes):
+    response = await client.get("/api/v1/hero/all", params={"search": "super"})
+    assert [item["name"] for item in response.json()] == ["Superman", "Supergirl"]
+
+
+async def test_ilike_filter(client, heroes):
+    response = await client.get("/api/v1/hero", params={"name__ilike": "%MAN"})
+    assert [item["name"] for item in response.json()["items"]] == ["Batman", "Superman"]
+
+
+async def test_substring_match_uses_trigram_index(session, heroes):
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = await session.scalars(text("EXPLAIN SELECT id FROM heroes WHERE name ILIKE '%uper%'"))
+    assert "ix_heroes_name_trigram" in "\n".join(plan)
+
+
+def test_create_all_creates_trigram_extension():
+    statements = []
+    engine = create_mock_engine("postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql).strip()))
+    Base.metadata.create_all(engine, checkfirst=False)
+    extension = statements.index("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    assert extension < next(i for i, sql in enumerate(statements) if sql.startswith("CREATE TABLE heroes"))
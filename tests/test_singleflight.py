@@ -0,0 +1,127 @@
+"""
+Coalescing of identical concurrent GET requests by the single-flight route.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from app.core.singleflight import SingleFlightRoute
+
+pytestmark = pytest.mark.anyio
+
+
+class Backend:
+    """
+    Endpoint handlers counting their calls, and blocking until released
+    """
+
+    def __init__(self):
+        self.calls: list[str] = []
+        self.release = asyncio.Event()
+
+    async def handle(self, name: str) -> dict:
+        self.calls.append(name)
+        call = len(self.calls)
+        await self.release.wait()
+        return {"name": name, "call": call}
+
+
+@pytest.fixture
+def backend() -> Backend:
+    return Backend()
+
+
+def create_client(backend: Backend, stale_ttl: float = 0.0) -> httpx.AsyncClient:
+    router = APIRouter(route_class=SingleFlightRoute.configure(stale_ttl))
+
+    @router.get("/hero/{id}")
+    async def read(id: str, fields: str | None = None, sort: str | None = None) -> dict:
+        return await backend.handle(f"{id}:{fields}:{sort}")
+
+    @router.post("/hero")
+    async def create() -> dict:
+        return await backend.handle("create")
+
+    app = FastAPI()
+    app.include_router(router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def concurrently(backend: Backend, *requests) -> list[httpx.Response]:
+    """
+    Sends the requests at the same time, and releases the handlers once all requests have arrived
+    """
+    tasks = [asyncio.create_task(request) for request in requests]
+    for _ in range(10):
+        await asyncio.sleep(0)
+    backend.release.set()
+    return await asyncio.gather(*tasks)
+
+
+async def test_identical_requests_share_a_response(backend):
+    async with create_client(backend) as client:
+        responses = await concurrently(
+            backend,
+            client.get("/hero/1", params=[("fields", "name"), ("sort", "asc")]),
+            # The order of query parameters does not matter
+            client.get("/hero/1", params=[("sort", "asc"), ("fields", "name")]),
+        )
+    assert backend.calls == ["1:name:asc"]
+    assert responses[0].json() == responses[1].json()
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        {"url": "/hero/2", "params": {"fields": "name"}},
+        {"url": "/hero/1", "params": {"fields": "id"}},
+        {"url": "/hero/1", "params": {"fields": "name"}, "headers": {"Authorization": "Bearer other"}},
+        {"url": "/hero/1", "params": {"fields": "name"}, "headers": {"If-None-Match": 'W/"abc"'}},
+        {"url": "/hero/1", "params": {"fields": "name"}, "headers": {"Accept": "application/x-ndjson"}},
+    ],
+)
+async def test_different_requests_are_not_shared(backend, other):
+    async with create_client(backend) as client:
+        responses = await concurrently(
+            backend,
+            client.get("/hero/1", params={"fields": "name"}, headers={"Authorization": "Bearer token"}),
+            client.get(**{"headers": {"Authorization": "Bearer token"}, **other}),
+        )
+    assert len(backend.calls) == 2
+    assert responses[0].json()["call"] != responses[1].json()["call"]
+
+
+async def test_post_requests_are_never_shared(backend):
+    async with create_client(backend) as client:
+        await concurrently(backend, client.post("/hero"), client.post("/hero"))
+    assert backend.calls == ["create", "create"]
+
+
+async def test_stale_response_only_while_in_flight(backend):
+    backend.release.set()
+    async with create_client(backend, stale_ttl=60) as client:
+        first = await client.get("/hero/1")
+        # Without a request in flight, the handler runs even though a recent response exists
+        second = await client.get("/hero/1")
+        assert [first.json()["call"], second.json()["call"]] == [1, 2]
+
+        backend.release.clear()
+        revalidating = asyncio.create_task(client.get("/hero/1"))
+        while len(backend.calls) < 3:
+            await asyncio.sleep(0)
+        # Served the recent response right away, instead of waiting for the request in flight
+        stale = await asyncio.wait_for(client.get("/hero/1"), 1)
+        assert stale.json()["call"] == 2
+        backend.release.set()
+        assert (await revalidating).json()["call"] == 3
+    assert len(backend.calls) == 3
+
+
+async def test_without_stale_ttl_requests_wait_for_the_flight(backend):
+    async with create_client(backend) as client:
+        responses = await concurrently(backend, client.get("/hero/1"), client.get("/hero/1"), client.get("/hero/1"))
+    assert len(backend.calls) == 1
+    assert {response.json()["call"] for response in responses} == {1}
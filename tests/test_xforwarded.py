@@ -0,0 +1,177 @@
+"""
+Client address, scheme and host taken from the forwarding headers written by the trusted proxies.
+"""
+
+from ipaddress import ip_network
+
+import pytest
+
+from app.core.middleware import XForwardedMiddleware
+from app.core.middleware.xforwarded import ForwardedHeader, TrustedNetworks, parse_forwarded
+
+pytestmark = pytest.mark.anyio
+
+PROXIES = [ip_network("10.0.0.0/8"), ip_network("10.1.2.0/24"), ip_network("192.168.1.1/32"), ip_network("fd00::/8")]
+
+
+async def forward(
+    headers: list[tuple[str, str]], proxies=PROXIES, header=ForwardedHeader.X_FORWARDED_FOR
+) -> tuple[dict, dict]:
+    """Run a request through the middleware and return the scope and state the application sees."""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen.update(scope)
+
+    scope = {
+        "type": "http",
+        "scheme": "http",
+        "client": ("10.0.0.1", 1234),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    await XForwardedMiddleware(app, proxies=proxies, header=header)(scope, None, None)
+    return seen, seen["state"]
+
+
+def test_trusted_networks_mixed_versions():
+    networks = TrustedNetworks(PROXIES)
+    assert networks.contains("10.200.0.1")
+    assert networks.contains("10.1.2.3")
+    assert networks.contains("192.168.1.1")
+    assert not networks.contains("192.168.1.2")
+    assert networks.contains("fd12:3456::1")
+    assert not networks.contains("fe80::1")
+    assert not networks.contains("11.0.0.1")
+    assert networks.contains("unknown") is None
+    assert networks.contains("_hidden") is None
+
+
+def test_trusted_networks_longest_prefix():
+    # The /32 is more specific than the /24 containing it; both must match and neither shadows the other
+    networks = TrustedNetworks([ip_network("203.0.113.0/24"), ip_network("198.51.100.7/32"), ip_network("::1/128")])
+    assert networks.contains("203.0.113.255")
+    assert networks.contains("198.51.100.7")
+    assert not networks.contains("198.51.100.6")
+    assert networks.contains("::1")
+    assert not networks.contains("::2")
+    # Same integer value in another address family
+    assert not networks.contains("::cb00:7101")
+
+
+def test_trusted_networks_ipv4_mapped():
+    networks = TrustedNetworks(PROXIES)
+    assert networks.contains("::ffff:10.0.0.5")
+    assert not networks.contains("::ffff:11.0.0.5")
+    assert not TrustedNetworks([])
+
+
+def test_parse_forwarded():
+    assert parse_forwarded('for=192.0.2.60;proto=HTTP;by=203.0.113.43, For="[2001:db8::1]:4711";host=example.com') == [
+        {"for": "192.0.2.60", "proto": "HTTP", "by": "203.0.113.43"},
+        {"for": "[2001:db8::1]:4711", "host": "example.com"},
+    ]
+    assert parse_forwarded("for=_hidden, for=unknown") == [{"for": "_hidden"}, {"for": "unknown"}]
+    assert parse_forwarded("garbage") == [{}]
+
+
+@pytest.mark.parametrize(
+    "addresses, index",
+    [
+        (["1.1.1.1", "2.2.2.2", "10.0.0.2"], 1),
+        (["1.1.1.1", "10.1.2.3", "fd00::1"], 0),
+        (["10.0.0.3", "10.0.0.2"], 0),
+        (["1.1.1.1", "unknown", "10.0.0.2"], 1),
+        (["::ffff:1.1.1.1", "::ffff:10.0.0.2"], 0),
+    ],
+)
+def test_get_client_index(addresses, index):
+    assert XForwardedMiddleware(None, proxies=PROXIES)._get_client_index(addresses) == index
+
+
+def test_get_client_index_without_proxies():
+    assert XForwardedMiddleware(None)._get_client_index(["1.1.1.1", "2.2.2.2"]) == 1
+
+
+async def test_x_forwarded_for():
+    scope, state = await forward(
+        [("X-Forwarded-For", "1.1.1.1, 2.2.2.2, 10.0.0.2"), ("X-Forwarded-Host", "example.com")]
+    )
+    assert scope["client"] == ("2.2.2.2", 1234)
+    assert state["forwarded_host"] == "example.com"
+
+
+async def test_all_hops_trusted():
+    scope, _ = await forward([("X-Forwarded-For", "10.0.0.3, 10.0.0.2")])
+    assert scope["client"] == ("10.0.0.3", 1234)
+
+
+async def test_invalid_hop_keeps_client():
+    scope, _ = await forward([("X-Forwarded-For", "1.1.1.1, not-an-ip, 10.0.0.2")])
+    assert scope["client"] == ("10.0.0.1", 1234)
+
+
+async def test_duplicate_headers_are_ignored():
+    scope, state = await forward(
+        [
+            ("X-Forwarded-For", "1.1.1.1"),
+            ("X-Forwarded-For", "2.2.2.2"),
+            ("X-Forwarded-Host", "a.example.com"),
+            ("X-Forwarded-Host", "b.example.com"),
+        ]
+    )
+    assert scope["client"] == ("10.0.0.1", 1234)
+    assert state["forwarded_host"] is None
+
+
+@pytest.mark.parametrize(
+    "forwarded_for, forwarded_proto, scheme",
+    [
+        ("1.1.1.1, 10.0.0.2", "https, http", "https"),
+        ("1.1.1.1, 2.2.2.2, 10.0.0.2", "ftp, https, http", "https"),
+        # ingress-nginx only keeps one entry
+        ("1.1.1.1, 2.2.2.2, 10.0.0.2", "https", "https"),
+        ("1.1.1.1, 2.2.2.2, 10.0.0.2", "https, http", "https"),
+    ],
+)
+async def test_forwarded_proto_alignment(forwarded_for, forwarded_proto, scheme):
+    scope, _ = await forward([("X-Forwarded-For", forwarded_for), ("X-Forwarded-Proto", forwarded_proto)])
+    assert scope["scheme"] == scheme
+
+
+async def test_forwarded_header_is_ignored_by_default():
+    # nginx appends to X-Forwarded-For but passes a client's own Forwarded header on unchanged
+    scope, state = await forward(
+        [
+            ("Forwarded", "for=6.6.6.6;proto=https;host=evil.example.com"),
+            ("X-Forwarded-For", "1.1.1.1, 10.0.0.2"),
+            ("X-Forwarded-Proto", "http, http"),
+        ]
+    )
+    assert scope["client"] == ("1.1.1.1", 1234)
+    assert scope["scheme"] == "http"
+    assert state["forwarded_host"] is None
+
+
+async def test_forwarded():
+    scope, state = await forward(
+        [
+            ("Forwarded", 'for=1.1.1.1, for="[2001:db8::1]:4711";proto=HTTPS;host=example.com, for=10.0.0.2'),
+            ("X-Forwarded-For", "6.6.6.6"),
+            ("X-Forwarded-Host", "evil.example.com"),
+        ],
+        header=ForwardedHeader.FORWARDED,
+    )
+    assert scope["client"] == ("2001:db8::1", 1234)
+    assert scope["scheme"] == "https"
+    assert state["forwarded_host"] == "example.com"
+
+
+async def test_forwarded_obfuscated_hop_keeps_client():
+    scope, _ = await forward([("Forwarded", "for=1.1.1.1, for=_hidden, for=10.0.0.2")], header="forwarded")
+    assert scope["client"] == ("10.0.0.1", 1234)
+
+
+async def test_forwarded_mode_ignores_x_forwarded_for():
+    scope, state = await forward([("X-Forwarded-For", "6.6.6.6")], header=ForwardedHeader.FORWARDED)
+    assert scope["client"] == ("10.0.0.1", 1234)
+    assert state["forwarded_host"] is None